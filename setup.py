@@ -11,8 +11,23 @@ doc_reqs = [
     'Sphinx>=1.5.2'
 ]
 
+brotli_reqs = [
+    'brotli>=1.0.9'
+]
+
+httpx_reqs = [
+    'httpx[http2]>=0.20.0; python_version >= "3.6"'
+]
+
+orjson_reqs = [
+    'orjson>=3.0.0; python_version >= "3.6"'
+]
+
 extra_reqs = {
+    'brotli': brotli_reqs,
     'doc': doc_reqs,
+    'httpx': httpx_reqs,
+    'orjson': orjson_reqs,
     'test': test_reqs
 }
 
@@ -26,6 +41,7 @@ setup(
     author_email="paul@echonest.com",
     url='https://spotipy.readthedocs.org/',
     install_requires=[
+        'futures>=3.0.0; python_version < "3"',
         'requests>=2.25.0',
         'six>=1.15.0',
         'urllib3>=1.26.0'
@@ -2,4 +2,7 @@ from .cache_handler import *  # noqa
 from .client import *  # noqa
 from .exceptions import *  # noqa
 from .oauth2 import *  # noqa
+from .rate_limit import *  # noqa
+from .response_cache import *  # noqa
+from .transport import *  # noqa
 from .util import *  # noqa
@@ -4,18 +4,164 @@
 
 __all__ = ["Spotify", "SpotifyException"]
 
+import hashlib
 import json
 import logging
+import re
+import threading
+import time
 import warnings
+from collections import OrderedDict
 
 import requests
-import six
 import urllib3
+from requests.compat import urlencode
 
 from spotipy.exceptions import SpotifyException
+from spotipy.rate_limit import RateLimiter
+from spotipy.transport import HTTPXSession
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the json module is used without it
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+_RETRY_METHODS = frozenset(("GET", "POST", "PUT", "DELETE"))
+
+_REPEAT_STATES = frozenset(("track", "context", "off"))
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+# statuses for which a stale cached response is served instead of an error
+_STALE_IF_ERROR_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# playback state is only useful while it is current, so it is never cached
+_UNCACHED_PATH = "me/player"
+
+# matches the `offset` query parameter of a paged result's `next` URL
+_OFFSET_PARAM_RE = re.compile(r"([?&])offset=\d+")
+
+# the min_, max_ and target_ parameters of the tuneable track attributes
+_RECOMMENDATION_PARAMS = frozenset(
+    prefix + attribute
+    for prefix in ("min_", "max_", "target_")
+    for attribute in (
+        "acousticness",
+        "danceability",
+        "duration_ms",
+        "energy",
+        "instrumentalness",
+        "key",
+        "liveness",
+        "loudness",
+        "mode",
+        "popularity",
+        "speechiness",
+        "tempo",
+        "time_signature",
+        "valence",
+    )
+)
+
+# the endpoint of each type of item in the user's library, how many ids it
+# takes at once, and whether it takes them in the body or the query string
+_SAVED_ITEMS = {
+    "album": ("me/albums", 20, True),
+    "episode": ("me/episodes", 50, True),
+    "show": ("me/shows", 50, False),
+    "track": ("me/tracks", 50, True),
+}
+
+try:
+    _STRING_TYPES = basestring  # Python 2, where names may be unicode
+except NameError:
+    _STRING_TYPES = str
+
+# a bare Spotify ID, which _get_id can return without parsing
+_BASE62_ID_RE = re.compile(r"[0-9A-Za-z]{22}\Z")
+
+
+# without whitespace after separators, like orjson, so bodies of hundreds
+# of URIs are smaller; created once rather than by every json.dumps call
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def _json_dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return _JSON_ENCODER.encode(payload)
+
+
+def _json_loads(content):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content.decode("utf-8"))
+
+
+def _batches(items, size):
+    """ Splits `items` into lists of at most `size` items. """
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _unique(ids):
+    """ Returns `ids` without duplicates, in the order they first appear. """
+    return list(OrderedDict.fromkeys(ids))
+
+
+def _expand(ids, unique_ids, results):
+    """ Maps the results for `unique_ids` back onto every id in `ids`. """
+    result_by_id = dict(zip(unique_ids, results))
+    return [result_by_id[id] for id in ids]
+
+
+def _page(result):
+    """ Returns the paging object of a result. Those of searches, new
+        releases and the like, and the pages following them, are wrapped
+        in a single key, e.g. {"albums": {...}}.
+    """
+    if "items" not in result and len(result) == 1:
+        return list(result.values())[0]
+    return result
+
+
+def _cache_key(url, params, language=None, authorization=None):
+    """ Returns the key a GET request's response is cached under. Responses
+        are kept apart by the language they were requested in, and those
+        about the current user by a digest of the Authorization header they
+        were requested with.
+    """
+    key = url
+    if params:
+        key += ("&" if "?" in url else "?") + urlencode(sorted(params.items()), True)
+    if language:
+        key += "#" + language
+    if authorization:
+        key += "#" + hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+    return key
+
+
+def _max_age(response):
+    """ Returns for how many seconds a response may be used without
+        revalidating it, from its Cache-Control header.
+    """
+    cache_control = response.headers.get("Cache-Control", "")
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+def _retry_after(response, default=0):
+    """ Returns the number of seconds a 429 response asks to wait, or
+        `default` when it doesn't say.
+    """
+    try:
+        return max(int(response.headers["Retry-After"]), 0)
+    except (KeyError, ValueError):
+        return default
+
 
 class Spotify(object):
     """
@@ -34,7 +180,7 @@ class Spotify(object):
     """
     max_retries = 3
     default_retry_codes = (429, 500, 502, 503, 504)
-    country_codes = [
+    country_codes = (
         "AD",
         "AR",
         "AU",
@@ -94,7 +240,7 @@ class Spotify(object):
         "TR",
         "GB",
         "US",
-        "UY"]
+        "UY")
 
     def __init__(
         self,
@@ -110,16 +256,21 @@ class Spotify(object):
         status_retries=max_retries,
         backoff_factor=0.3,
         language=None,
+        max_workers=8,
+        transport="requests",
+        rate_limit=None,
+        response_cache=None,
+        stale_if_error=False,
     ):
         """
         Creates a Spotify API client.
 
         :param auth: An access token (optional)
         :param requests_session:
-            A Requests session object or a truthy value to create one.
-            A falsy value disables sessions.
-            It should generally be a good idea to keep sessions enabled
-            for performance reasons (connection pooling).
+            A Requests session object, an HTTPXSession, or a truthy value to
+            create one.
+            Passing a falsy value to disable sessions is deprecated; a
+            session is created anyway so that connections are pooled.
         :param client_credentials_manager:
             SpotifyClientCredentials object
         :param oauth_manager:
@@ -145,8 +296,42 @@ class Spotify(object):
         :param language:
             The language parameter advertises what language the user prefers to see.
             See ISO-639 language code: https://www.loc.gov/standards/iso639-2/php/code_list.php
+        :param max_workers:
+            Maximum number of requests sent concurrently by methods that
+            fan out over several API calls (e.g. `search_markets`).
+            A value of 1 sends those requests one after another.
+        :param transport:
+            The HTTP client used when no `requests_session` is given:
+            "requests" (the default) or "httpx", which multiplexes concurrent
+            requests over one HTTP/2 connection. The httpx transport only
+            retries failed connections, not bad status codes.
+        :param rate_limit:
+            Maximum number of requests per second, or a `RateLimiter`
+            shared with other clients (optional). Requests beyond it wait
+            instead of being sent, and a 429 response holds back further
+            requests for as long as its Retry-After header asks for, after
+            which the request is retried (up to `status_retries` times).
+        :param response_cache:
+            A ResponseCache (e.g. MemoryResponseCache) to keep responses
+            that have an ETag or a Cache-Control max-age in (optional).
+            Until its max-age has passed, a cached response is used without
+            sending a request. After that, the request is sent with
+            If-None-Match, and the cached response is used when the API
+            answers that it hasn't changed. Responses are only used again
+            for requests in the same `language`. Those the API marks as
+            private, and those of the current user's endpoints (`me/...`),
+            are only used again for requests sent with the same access
+            token, so one cache can be shared by the clients of several
+            users.
+        :param stale_if_error:
+            Keep every GET response in the `response_cache`, and return the
+            cached response instead of raising when the API can't be
+            reached, is rate limiting or fails with a 5xx status. The
+            playback state (`me/player...`) and responses marked no-store
+            are never cached, so they are never returned out of date.
         """
         self.prefix = "https://api.spotify.com/v1/"
+        self._auth_lock = threading.Lock()
         self._auth = auth
         self.client_credentials_manager = client_credentials_manager
         self.oauth_manager = oauth_manager
@@ -158,14 +343,31 @@ class Spotify(object):
         self.retries = retries
         self.status_retries = status_retries
         self.language = language
+        self.max_workers = max_workers
+        if transport not in ("requests", "httpx"):
+            raise ValueError("transport must be 'requests' or 'httpx'")
+        self.transport = transport
+        if rate_limit is None or isinstance(rate_limit, RateLimiter):
+            self.rate_limiter = rate_limit
+        else:
+            self.rate_limiter = RateLimiter(rate_limit)
+        self.response_cache = response_cache
+        self.stale_if_error = stale_if_error
 
-        if isinstance(requests_session, requests.Session):
+        self._owns_session = not isinstance(requests_session, (requests.Session, HTTPXSession))
+        if not self._owns_session:
             self._session = requests_session
+            # a session passed in may be shared, so leave its headers alone
+            self._request_headers = self._static_headers()
         else:
-            if requests_session:  # Build a new session.
-                self._build_session()
-            else:  # Use the Requests API module as a "session".
-                self._session = requests.api
+            if not requests_session:
+                warnings.warn(
+                    "Disabling sessions is deprecated: every request goes to the "
+                    "same host, so a pooled session is now always used",
+                    DeprecationWarning,
+                )
+            self._build_session()
+            self._request_headers = {}
 
     def set_auth(self, auth):
         self._auth = auth
@@ -182,78 +384,194 @@ class Spotify(object):
             self._auth_manager = (
                 self.client_credentials_manager or self.oauth_manager
             )
+        self._cached_auth_headers = ({}, 0)
+
+    @property
+    def language(self):
+        return self._language
+
+    @language.setter
+    def language(self, language):
+        self._language = language
+        if getattr(self, "_session", None) is None:
+            return
+        # the header is set on a session the client created, and sent with
+        # every request otherwise
+        if self._owns_session:
+            if language is None:
+                self._session.headers.pop("Accept-Language", None)
+            else:
+                self._session.headers["Accept-Language"] = language
+        else:
+            self._request_headers = self._static_headers()
 
     def __del__(self):
         """Make sure the connection (pool) gets closed"""
-        if isinstance(self._session, requests.Session):
-            self._session.close()
+        session = getattr(self, "_session", None)
+        if isinstance(session, requests.Session):
+            session.close()
+        elif isinstance(session, HTTPXSession) and self._owns_session:
+            # a closed httpx client can't send requests for other clients
+            session.close()
 
     def _build_session(self):
+        pool_size = max(self.max_workers, requests.adapters.DEFAULT_POOLSIZE)
+        if self.transport == "httpx":
+            self._session = HTTPXSession(
+                headers=self._static_headers(),
+                proxies=self.proxies,
+                retries=self.retries,
+                max_connections=pool_size)
+            return
+
         self._session = requests.Session()
+        self._session.headers.update(self._static_headers())
+        # also ask for brotli, which compresses JSON better than gzip, when
+        # a brotli package is installed for urllib3 to decode it
+        self._session.headers.update(urllib3.util.make_headers(accept_encoding=True))
+        status_forcelist = self.status_forcelist
+        if self.rate_limiter is not None:
+            # the limiter retries these itself, holding back other threads too
+            status_forcelist = [code for code in status_forcelist if code != 429]
         retry = urllib3.Retry(
             total=self.retries,
             connect=None,
             read=False,
-            allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+            allowed_methods=_RETRY_METHODS,
             status=self.status_retries,
             backoff_factor=self.backoff_factor,
-            status_forcelist=self.status_forcelist)
+            status_forcelist=status_forcelist)
 
-        adapter = requests.adapters.HTTPAdapter(max_retries=retry)
+        # size the pool so that concurrent requests don't have to open
+        # (and then discard) connections beyond the pool
+        adapter = requests.adapters.HTTPAdapter(
+            pool_maxsize=pool_size,
+            max_retries=retry)
         self._session.mount('http://', adapter)
         self._session.mount('https://', adapter)
 
+    def _static_headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.language is not None:
+            headers["Accept-Language"] = self.language
+        return headers
+
     def _auth_headers(self):
         if self._auth:
             return {"Authorization": "Bearer {0}".format(self._auth)}
         if not self.auth_manager:
             return {}
-        try:
-            token = self.auth_manager.get_access_token(as_dict=False)
-        except TypeError:
-            token = self.auth_manager.get_access_token()
-        return {"Authorization": "Bearer {0}".format(token)}
+        headers, expires_at = self._cached_auth_headers
+        if time.time() < expires_at:
+            return dict(headers)
+        # threads fanning out requests all find the token expired at once,
+        # but only the first one asks the auth manager to renew it
+        with self._auth_lock:
+            headers, expires_at = self._cached_auth_headers
+            if time.time() < expires_at:
+                return dict(headers)
+            try:
+                token = self.auth_manager.get_access_token(as_dict=False)
+            except TypeError:
+                token = self.auth_manager.get_access_token()
+            headers = {"Authorization": "Bearer {0}".format(token)}
+            self._cached_auth_headers = (headers, self._token_expires_at(token))
+        return dict(headers)
+
+    def _token_expires_at(self, token):
+        """ Returns when the auth headers built from `token` must be renewed,
+            so that the auth manager isn't asked for a token on every request.
+        """
+        cache_handler = getattr(self.auth_manager, "cache_handler", None)
+        token_info = cache_handler.get_cached_token() if cache_handler else None
+        if not token_info or token_info.get("access_token") != token:
+            return 0
+        # renew a minute early, like the auth managers themselves do
+        return token_info.get("expires_at", 0) - 60
 
     def _internal_call(self, method, url, payload, params):
-        args = dict(params=params)
+        # parameters that are None are left out of the query
+        args = dict(params={k: v for k, v in params.items() if v is not None})
         if not url.startswith("http"):
             url = self.prefix + url
         headers = self._auth_headers()
+        headers.update(self._request_headers)
 
         if "content_type" in args["params"]:
             headers["Content-Type"] = args["params"]["content_type"]
             del args["params"]["content_type"]
             if payload:
                 args["data"] = payload
-        else:
-            headers["Content-Type"] = "application/json"
-            if payload:
-                args["data"] = json.dumps(payload)
-
-        if self.language is not None:
-            headers["Accept-Language"] = self.language
+        elif payload:
+            args["data"] = _json_dumps(payload)
+
+        shared_key = private_key = cached = None
+        path = url[len(self.prefix):] if url.startswith(self.prefix) else url
+        if (method == "GET" and self.response_cache is not None
+                and not path.startswith(_UNCACHED_PATH)):
+            # responses marked private, and those about the current user,
+            # are cached for the access token they were sent to only
+            private_key = _cache_key(url, args["params"], self.language,
+                                     headers.get("Authorization", ""))
+            if not (path == "me" or path.startswith(("me/", "me?"))):
+                shared_key = _cache_key(url, args["params"], self.language)
+            for cache_key in (shared_key, private_key):
+                cached = self.response_cache.get_cached_response(cache_key) if cache_key else None
+                if cached is not None:
+                    break
+            if cached is not None and cached.get("expires_at", 0) > time.time():
+                logger.debug('%s is still fresh, using the cached response', url)
+                return _json_loads(cached["body"])
+            if cached is not None and cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
 
         logger.debug('Sending %s to %s with Params: %s Headers: %s and Body: %r ',
                      method, url, args.get("params"), headers, args.get('data'))
 
         try:
-            response = self._session.request(
+            response = self._send(
                 method, url, headers=headers, proxies=self.proxies,
                 timeout=self.requests_timeout, **args
             )
 
             response.raise_for_status()
-            results = response.json()
+            if cached is not None and response.status_code == 304:
+                logger.debug('%s has not changed, using the cached response', url)
+                content = cached["body"]
+                etag = cached["etag"]
+            else:
+                content = response.content
+                etag = response.headers.get("ETag")
+            cache_control = response.headers.get("Cache-Control", "")
+            if private_key is not None and "no-store" not in cache_control:
+                max_age = _max_age(response)
+                if shared_key is None or "private" in cache_control:
+                    cache_key = private_key
+                else:
+                    cache_key = shared_key
+                if etag or max_age or self.stale_if_error:
+                    self.response_cache.save_response_to_cache(cache_key, {
+                        "etag": etag, "body": content, "expires_at": time.time() + max_age})
+            results = _json_loads(content)
         except requests.exceptions.HTTPError as http_error:
             response = http_error.response
+            if response.status_code == 401:
+                # the token may have been revoked before it expired
+                self._cached_auth_headers = ({}, 0)
+            elif response.status_code == 429 and self.rate_limiter is not None:
+                self.rate_limiter.pause(_retry_after(response))
+            if response.status_code in _STALE_IF_ERROR_STATUSES:
+                stale = self._stale_response(cached, url, response.status_code)
+                if stale is not None:
+                    return stale
             try:
-                msg = response.json()["error"]["message"]
-            except (ValueError, KeyError):
-                msg = "error"
-            try:
-                reason = response.json()["error"]["reason"]
-            except (ValueError, KeyError):
-                reason = None
+                error = _json_loads(response.content)["error"]
+            except (ValueError, KeyError, TypeError):
+                error = {}
+            if not isinstance(error, dict):
+                error = {}
+            msg = error.get("message", "error")
+            reason = error.get("reason")
 
             logger.error('HTTP Error for %s to %s returned %s due to %s',
                          method, url, response.status_code, msg)
@@ -266,6 +584,9 @@ class Spotify(object):
                 headers=response.headers,
             )
         except requests.exceptions.RetryError as retry_error:
+            stale = self._stale_response(cached, url, "max retries")
+            if stale is not None:
+                return stale
             request = retry_error.request
             logger.error('Max Retries reached')
             try:
@@ -278,31 +599,109 @@ class Spotify(object):
                 "%s:\n %s" % (request.path_url, "Max Retries"),
                 reason=reason
             )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+            stale = self._stale_response(cached, url, error)
+            if stale is None:
+                raise
+            return stale
         except ValueError:
             results = None
 
         logger.debug('RESULTS: %s', results)
         return results
 
-    def _get(self, url, args=None, payload=None, **kwargs):
-        if args:
-            kwargs.update(args)
+    def _send(self, method, url, **kwargs):
+        """ Sends a request, paced by the rate limiter if there is one.
+            A 429 response then holds back every request for as long as
+            its Retry-After header asks for, or backs off like the session's
+            retries when it has none, and the request is sent again, up to
+            `status_retries` times.
+        """
+        if self.rate_limiter is None:
+            return self._session.request(method, url, **kwargs)
+        for attempt in range(self.status_retries or 0):
+            self.rate_limiter.acquire()
+            response = self._session.request(method, url, **kwargs)
+            if response.status_code != 429:
+                return response
+            logger.debug('Rate limited, retrying %s to %s', method, url)
+            self.rate_limiter.pause(
+                _retry_after(response, self.backoff_factor * 2 ** attempt))
+        self.rate_limiter.acquire()
+        return self._session.request(method, url, **kwargs)
+
+    def _stale_response(self, cached, url, error):
+        """ Returns the decoded `cached` response when stale responses are
+            served on errors, or None.
+        """
+        if cached is None or not self.stale_if_error:
+            return None
+        logger.warning('Request to %s failed (%s), using the cached response', url, error)
+        try:
+            return _json_loads(cached["body"])
+        except ValueError:
+            return None
+
+    def _get_several(self, url, key, ids, batch_size, **kwargs):
+        """ Gets several objects by id, splitting `ids` into batches of at
+            most `batch_size` (the most the endpoint accepts) which are
+            fetched concurrently, and merges the objects listed under `key`.
+        """
+        def get_batch(batch):
+            return self._get(url, ids=",".join(batch), **kwargs)[key]
+
+        return {key: [item for batch in self.parallel_map(get_batch, _batches(ids, batch_size))
+                      for item in batch]}
+
+    def _contains(self, url, ids, batch_size, unique=False, **kwargs):
+        """ Checks several ids with a `contains` endpoint, in concurrent
+            batches of at most `batch_size`, and returns a boolean per id.
+            With `unique`, each id is only sent once.
+        """
+        def get_batch(batch):
+            return self._get(url, ids=",".join(batch), **kwargs)
+
+        checked = _unique(ids) if unique else ids
+        results = [found for batch in self.parallel_map(get_batch, _batches(checked, batch_size))
+                   for found in batch]
+        return _expand(ids, checked, results) if unique else results
+
+    def _saved_items(self, operation, type, items, unique=False):
+        """ Adds, deletes or checks (`operation`) items of a type in the
+            current user's library, using the endpoint listed for the type
+            in _SAVED_ITEMS.
+        """
+        url, batch_size, in_body = _SAVED_ITEMS[type]
+        ids = self._get_ids(type, items or [])
+        if operation == "contains":
+            return self._contains(url + "/contains", ids, batch_size, unique)
+        send = self._put if operation == "add" else self._delete
+        return self._send_batches(send, url, ids, batch_size, in_body=in_body)
+
+    def _send_batches(self, send, url, ids, batch_size, in_body=True, **kwargs):
+        """ Sends `ids` to `url` with `send`, in batches of at most
+            `batch_size` one after another, and returns the last result.
+            The ids go in the JSON body unless the endpoint only reads
+            them from the query string.
+        """
+        result = None
+        for batch in _batches(ids, batch_size):
+            if in_body:
+                result = send(url, payload={"ids": batch}, **kwargs)
+            else:
+                result = send(url, ids=",".join(batch), **kwargs)
+        return result
 
+    def _get(self, url, payload=None, **kwargs):
         return self._internal_call("GET", url, payload, kwargs)
 
-    def _post(self, url, args=None, payload=None, **kwargs):
-        if args:
-            kwargs.update(args)
+    def _post(self, url, payload=None, **kwargs):
         return self._internal_call("POST", url, payload, kwargs)
 
-    def _delete(self, url, args=None, payload=None, **kwargs):
-        if args:
-            kwargs.update(args)
+    def _delete(self, url, payload=None, **kwargs):
         return self._internal_call("DELETE", url, payload, kwargs)
 
-    def _put(self, url, args=None, payload=None, **kwargs):
-        if args:
-            kwargs.update(args)
+    def _put(self, url, payload=None, **kwargs):
         return self._internal_call("PUT", url, payload, kwargs)
 
     def next(self, result):
@@ -327,6 +726,95 @@ class Spotify(object):
         else:
             return None
 
+    def iter_all(self, result):
+        """ yields every item of a paged result, fetching the following
+            pages as needed. Pages addressed by an offset are fetched
+            concurrently, up to `max_workers` at a time. Pages addressed by
+            a cursor are fetched one ahead, while the items of the current
+            page are consumed.
+
+            Parameters:
+                - result - a previously returned paged result
+        """
+        result = _page(result)
+        # pages that can't be addressed by their offset are fetched one by one
+        if result["next"] and ("offset" not in result or "total" not in result
+                               or not _OFFSET_PARAM_RE.search(result["next"])):
+            for item in self._iter_cursor_pages(result):
+                yield item
+            return
+
+        for item in result["items"]:
+            yield item
+        if not result["next"]:
+            return
+
+        def get_page(offset):
+            return self._get(_OFFSET_PARAM_RE.sub(
+                r"\g<1>offset=" + str(offset), result["next"]))
+
+        offsets = list(range(result["offset"] + result["limit"],
+                             result["total"], result["limit"]))
+        window = max(self.max_workers, 1)
+        for start in range(0, len(offsets), window):
+            pages = [_page(page) for page in
+                     self.parallel_map(get_page, offsets[start:start + window])]
+            for page in pages:
+                for item in page["items"]:
+                    yield item
+            if not pages[-1]["next"]:
+                return
+
+    def _iter_cursor_pages(self, result):
+        """ yields every item of a cursor-based paged result. As each page
+            only knows where the next one starts, the pages are fetched one
+            after another, but the next page is already requested while the
+            items of the current one are yielded.
+        """
+        def next_page(result):
+            following = self.next(result)
+            return _page(following) if following else None
+
+        if self.max_workers <= 1:
+            while result:
+                for item in result["items"]:
+                    yield item
+                result = next_page(result)
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while result:
+                following = executor.submit(next_page, result) if result["next"] else None
+                for item in result["items"]:
+                    yield item
+                result = following.result() if following else None
+
+    def parallel_map(self, func, items, max_workers=None):
+        """ calls `func` on every item from a pool of threads, so that the
+            requests it sends overlap, and returns the results in the same
+            order as `items`. For example, to get several playlists at once::
+
+                playlists = sp.parallel_map(sp.playlist, playlist_ids)
+
+            Parameters:
+                - func - a function of one argument, e.g. a bound method
+                  of this client
+                - items - the arguments to call `func` with
+                - max_workers - the most calls to run at once, defaults
+                  to the client's `max_workers`, which also sizes its
+                  connection pool
+        """
+        items = list(items)
+        if max_workers is None:
+            max_workers = self.max_workers
+        if max_workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        # only needed once requests are sent concurrently
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
+
     def track(self, track_id, market=None):
         """ returns a single track given the track's ID, URI or URL
 
@@ -342,12 +830,13 @@ class Spotify(object):
         """ returns a list of tracks given a list of track IDs, URIs, or URLs
 
             Parameters:
-                - tracks - a list of spotify URIs, URLs or IDs. Maximum: 50 IDs.
+                - tracks - a list of spotify URIs, URLs or IDs. Lists longer
+                           than 50 IDs are fetched in several requests.
                 - market - an ISO 3166-1 alpha-2 country code.
         """
 
-        tlist = [self._get_id("track", t) for t in tracks]
-        return self._get("tracks/?ids=" + ",".join(tlist), market=market)
+        tlist = self._get_ids("track", tracks)
+        return self._get_several("tracks", "tracks", tlist, 50, market=market)
 
     def artist(self, artist_id):
         """ returns a single artist given the artist's ID, URI or URL
@@ -363,11 +852,12 @@ class Spotify(object):
         """ returns a list of artists given the artist IDs, URIs, or URLs
 
             Parameters:
-                - artists - a list of  artist IDs, URIs or URLs
+                - artists - a list of  artist IDs, URIs or URLs. Lists longer
+                            than 50 IDs are fetched in several requests.
         """
 
-        tlist = [self._get_id("artist", a) for a in artists]
-        return self._get("artists/?ids=" + ",".join(tlist))
+        tlist = self._get_ids("artist", artists)
+        return self._get_several("artists", "artists", tlist, 50)
 
     def artist_albums(
         self, artist_id, album_type=None, country=None, limit=20, offset=0
@@ -444,11 +934,12 @@ class Spotify(object):
         """ returns a list of albums given the album IDs, URIs, or URLs
 
             Parameters:
-                - albums - a list of  album IDs, URIs or URLs
+                - albums - a list of  album IDs, URIs or URLs. Lists longer
+                           than 20 IDs are fetched in several requests.
         """
 
-        tlist = [self._get_id("album", a) for a in albums]
-        return self._get("albums/?ids=" + ",".join(tlist))
+        tlist = self._get_ids("album", albums)
+        return self._get_several("albums", "albums", tlist, 20)
 
     def show(self, show_id, market=None):
         """ returns a single show given the show's ID, URIs or URL
@@ -469,7 +960,8 @@ class Spotify(object):
         """ returns a list of shows given the show IDs, URIs, or URLs
 
             Parameters:
-                - shows - a list of show IDs, URIs or URLs
+                - shows - a list of show IDs, URIs or URLs. Lists longer
+                          than 50 IDs are fetched in several requests.
                 - market - an ISO 3166-1 alpha-2 country code.
                            Only shows available in the given market will be returned.
                            If user-based authorization is in use, the user's country
@@ -477,8 +969,8 @@ class Spotify(object):
                            provided, the content is considered unavailable for the client.
         """
 
-        tlist = [self._get_id("show", s) for s in shows]
-        return self._get("shows/?ids=" + ",".join(tlist), market=market)
+        tlist = self._get_ids("show", shows)
+        return self._get_several("shows", "shows", tlist, 50, market=market)
 
     def show_episodes(self, show_id, limit=50, offset=0, market=None):
         """ Get Spotify catalog information about a show's episodes
@@ -518,7 +1010,8 @@ class Spotify(object):
         """ returns a list of episodes given the episode IDs, URIs, or URLs
 
             Parameters:
-                - episodes - a list of episode IDs, URIs or URLs
+                - episodes - a list of episode IDs, URIs or URLs. Lists longer
+                             than 50 IDs are fetched in several requests.
                 - market - an ISO 3166-1 alpha-2 country code.
                            Only episodes available in the given market will be returned.
                            If user-based authorization is in use, the user's country
@@ -526,8 +1019,8 @@ class Spotify(object):
                            provided, the content is considered unavailable for the client.
         """
 
-        tlist = [self._get_id("episode", e) for e in episodes]
-        return self._get("episodes/?ids=" + ",".join(tlist), market=market)
+        tlist = self._get_ids("episode", episodes)
+        return self._get_several("episodes", "episodes", tlist, 50, market=market)
 
     def search(self, q, limit=10, offset=0, type="track", market=None):
         """ searches for an item
@@ -574,10 +1067,6 @@ class Spotify(object):
         if not (isinstance(markets, list) or isinstance(markets, tuple)):
             markets = []
 
-        warnings.warn(
-            "Searching multiple markets is poorly performing.",
-            UserWarning,
-        )
         return self._search_multiple_markets(q, limit, offset, type, markets, total)
 
     def user(self, user):
@@ -609,7 +1098,7 @@ class Spotify(object):
         """
         plid = self._get_id("playlist", playlist_id)
         return self._get(
-            "playlists/%s" % (plid),
+            "playlists/" + plid,
             fields=fields,
             market=market,
             additional_types=",".join(additional_types),
@@ -665,7 +1154,7 @@ class Spotify(object):
         """
         plid = self._get_id("playlist", playlist_id)
         return self._get(
-            "playlists/%s/tracks" % (plid),
+            "playlists/" + plid + "/tracks",
             limit=limit,
             offset=offset,
             fields=fields,
@@ -680,7 +1169,7 @@ class Spotify(object):
                 - playlist_id - the id of the playlist
         """
         plid = self._get_id("playlist", playlist_id)
-        return self._get("playlists/%s/images" % (plid))
+        return self._get("playlists/" + plid + "/images")
 
     def playlist_upload_cover_image(self, playlist_id, image_b64):
         """ Replace the image used to represent a specific playlist
@@ -692,7 +1181,7 @@ class Spotify(object):
         """
         plid = self._get_id("playlist", playlist_id)
         return self._put(
-            "playlists/{}/images".format(plid),
+            "playlists/" + plid + "/images",
             payload=image_b64,
             content_type="image/jpeg",
         )
@@ -711,7 +1200,7 @@ class Spotify(object):
                 - fields - which fields to return
         """
         if playlist_id is None:
-            return self._get("users/%s/starred" % user)
+            return self._get("users/" + user + "/starred")
         return self.playlist(playlist_id, fields=fields, market=market)
 
     def user_playlist_tracks(
@@ -755,7 +1244,7 @@ class Spotify(object):
                 - offset - the index of the first item to return
         """
         return self._get(
-            "users/%s/playlists" % user, limit=limit, offset=offset
+            "users/" + user + "/playlists", limit=limit, offset=offset
         )
 
     def user_playlist_create(self, user, name, public=True, collaborative=False, description=""):
@@ -775,7 +1264,7 @@ class Spotify(object):
             "description": description
         }
 
-        return self._post("users/%s/playlists" % (user,), payload=data)
+        return self._post("users/" + user + "/playlists", payload=data)
 
     def user_playlist_change_details(
         self,
@@ -919,19 +1408,16 @@ class Spotify(object):
             DeprecationWarning,
         )
         plid = self._get_id("playlist", playlist_id)
-        ftracks = []
-        for tr in tracks:
-            ftracks.append(
-                {
-                    "uri": self._get_uri("track", tr["uri"]),
-                    "positions": tr["positions"],
-                }
-            )
+        uris = self._get_uris("track", [tr["uri"] for tr in tracks])
+        ftracks = [
+            {"uri": uri, "positions": tr["positions"]}
+            for uri, tr in zip(uris, tracks)
+        ]
         payload = {"tracks": ftracks}
         if snapshot_id:
             payload["snapshot_id"] = snapshot_id
         return self._delete(
-            "users/%s/playlists/%s/tracks" % (user, plid), payload=payload
+            "users/" + user + "/playlists/" + plid + "/tracks", payload=payload
         )
 
     def user_playlist_follow_playlist(self, playlist_owner_id, playlist_id):
@@ -987,16 +1473,16 @@ class Spotify(object):
         """
 
         data = {}
-        if isinstance(name, six.string_types):
+        if isinstance(name, _STRING_TYPES):
             data["name"] = name
         if isinstance(public, bool):
             data["public"] = public
         if isinstance(collaborative, bool):
             data["collaborative"] = collaborative
-        if isinstance(description, six.string_types):
+        if isinstance(description, _STRING_TYPES):
             data["description"] = description
         return self._put(
-            "playlists/%s" % (self._get_id("playlist", playlist_id)), payload=data
+            "playlists/" + self._get_id("playlist", playlist_id), payload=data
         )
 
     def current_user_unfollow_playlist(self, playlist_id):
@@ -1007,7 +1493,7 @@ class Spotify(object):
                 - name - the name of the playlist
         """
         return self._delete(
-            "playlists/%s/followers" % (playlist_id)
+            "playlists/" + playlist_id + "/followers"
         )
 
     def playlist_add_items(
@@ -1017,30 +1503,36 @@ class Spotify(object):
 
             Parameters:
                 - playlist_id - the id of the playlist
-                - items - a list of track/episode URIs, URLs or IDs
+                - items - a list of track/episode URIs, URLs or IDs, which
+                  are added 100 at a time
                 - position - the position to add the tracks
         """
-        plid = self._get_id("playlist", playlist_id)
-        ftracks = [self._get_uri("track", tid) for tid in items]
-        return self._post(
-            "playlists/%s/tracks" % (plid),
-            payload=ftracks,
-            position=position,
-        )
+        url = "playlists/" + self._get_id("playlist", playlist_id) + "/tracks"
+        ftracks = self._get_uris("track", items)
+        result = None
+        for start in range(0, len(ftracks), 100):
+            result = self._post(
+                url,
+                payload=ftracks[start:start + 100],
+                position=None if position is None else position + start,
+            )
+        return result
 
     def playlist_replace_items(self, playlist_id, items):
         """ Replace all tracks/episodes in a playlist
 
             Parameters:
                 - playlist_id - the id of the playlist
-                - items - list of track/episode ids to comprise playlist
+                - items - list of track/episode ids to comprise playlist;
+                  the first 100 replace the playlist's items and the rest
+                  are added 100 at a time
         """
-        plid = self._get_id("playlist", playlist_id)
-        ftracks = [self._get_uri("track", tid) for tid in items]
-        payload = {"uris": ftracks}
-        return self._put(
-            "playlists/%s/tracks" % (plid), payload=payload
-        )
+        url = "playlists/" + self._get_id("playlist", playlist_id) + "/tracks"
+        ftracks = self._get_uris("track", items)
+        result = self._put(url, payload={"uris": ftracks[:100]})
+        for start in range(100, len(ftracks), 100):
+            result = self._post(url, payload=ftracks[start:start + 100])
+        return result
 
     def playlist_reorder_items(
         self,
@@ -1070,7 +1562,7 @@ class Spotify(object):
         if snapshot_id:
             payload["snapshot_id"] = snapshot_id
         return self._put(
-            "playlists/%s/tracks" % (plid), payload=payload
+            "playlists/" + plid + "/tracks", payload=payload
         )
 
     def playlist_remove_all_occurrences_of_items(
@@ -1080,19 +1572,22 @@ class Spotify(object):
 
             Parameters:
                 - playlist_id - the id of the playlist
-                - items - list of track/episode ids to remove from the playlist
+                - items - list of track/episode ids to remove from the playlist,
+                  which are removed 100 at a time
                 - snapshot_id - optional id of the playlist snapshot
 
         """
 
-        plid = self._get_id("playlist", playlist_id)
-        ftracks = [self._get_uri("track", tid) for tid in items]
-        payload = {"tracks": [{"uri": track} for track in ftracks]}
-        if snapshot_id:
-            payload["snapshot_id"] = snapshot_id
-        return self._delete(
-            "playlists/%s/tracks" % (plid), payload=payload
-        )
+        url = "playlists/" + self._get_id("playlist", playlist_id) + "/tracks"
+        tracks = [{"uri": uri} for uri in self._get_uris("track", items)]
+        result = None
+        for batch in _batches(tracks, 100):
+            payload = {"tracks": batch}
+            if snapshot_id:
+                # every batch is checked against the snapshot the caller saw
+                payload["snapshot_id"] = snapshot_id
+            result = self._delete(url, payload=payload)
+        return result
 
     def playlist_remove_specific_occurrences_of_items(
         self, playlist_id, items, snapshot_id=None
@@ -1109,20 +1604,19 @@ class Spotify(object):
                 - snapshot_id - optional id of the playlist snapshot
         """
 
+        if not items:
+            return None
         plid = self._get_id("playlist", playlist_id)
-        ftracks = []
-        for tr in items:
-            ftracks.append(
-                {
-                    "uri": self._get_uri("track", tr["uri"]),
-                    "positions": tr["positions"],
-                }
-            )
+        uris = self._get_uris("track", [tr["uri"] for tr in items])
+        ftracks = [
+            {"uri": uri, "positions": tr["positions"]}
+            for uri, tr in zip(uris, items)
+        ]
         payload = {"tracks": ftracks}
         if snapshot_id:
             payload["snapshot_id"] = snapshot_id
         return self._delete(
-            "playlists/%s/tracks" % (plid), payload=payload
+            "playlists/" + plid + "/tracks", payload=payload
         )
 
     def current_user_follow_playlist(self, playlist_id):
@@ -1134,7 +1628,7 @@ class Spotify(object):
 
         """
         return self._put(
-            "playlists/{}/followers".format(playlist_id)
+            "playlists/" + playlist_id + "/followers"
         )
 
     def playlist_is_following(
@@ -1146,12 +1640,11 @@ class Spotify(object):
         Parameters:
             - playlist_id - the id of the playlist
             - user_ids - the ids of the users that you want to check to see
-                if they follow the playlist. Maximum: 5 ids.
+                if they follow the playlist, which are checked 5 at a time
 
         """
-        endpoint = "playlists/{}/followers/contains?ids={}"
-        return self._get(
-            endpoint.format(playlist_id, ",".join(user_ids))
+        return self._contains(
+            "playlists/" + playlist_id + "/followers/contains", list(user_ids), 5
         )
 
     def me(self):
@@ -1187,31 +1680,29 @@ class Spotify(object):
         """ Add one or more albums to the current user's
             "Your Music" library.
             Parameters:
-                - albums - a list of album URIs, URLs or IDs
+                - albums - a list of album URIs, URLs or IDs, sent 20 at a time
         """
-
-        alist = [self._get_id("album", a) for a in albums]
-        return self._put("me/albums?ids=" + ",".join(alist))
+        return self._saved_items("add", "album", albums)
 
     def current_user_saved_albums_delete(self, albums=[]):
         """ Remove one or more albums from the current user's
             "Your Music" library.
 
             Parameters:
-                - albums - a list of album URIs, URLs or IDs
+                - albums - a list of album URIs, URLs or IDs, sent 20 at a time
         """
-        alist = [self._get_id("album", a) for a in albums]
-        return self._delete("me/albums/?ids=" + ",".join(alist))
+        return self._saved_items("delete", "album", albums)
 
-    def current_user_saved_albums_contains(self, albums=[]):
+    def current_user_saved_albums_contains(self, albums=[], unique=False):
         """ Check if one or more albums is already saved in
             the current Spotify user’s “Your Music” library.
 
             Parameters:
-                - albums - a list of album URIs, URLs or IDs
+                - albums - a list of album URIs, URLs or IDs, checked 20 at a time
+                - unique - only check each item once; the result still
+                  has a boolean for every item given
         """
-        alist = [self._get_id("album", a) for a in albums]
-        return self._get("me/albums/contains?ids=" + ",".join(alist))
+        return self._saved_items("contains", "album", albums, unique)
 
     def current_user_saved_tracks(self, limit=20, offset=0, market=None):
         """ Gets a list of the tracks saved in the current authorized user's
@@ -1230,36 +1721,29 @@ class Spotify(object):
             "Your Music" library.
 
             Parameters:
-                - tracks - a list of track URIs, URLs or IDs
+                - tracks - a list of track URIs, URLs or IDs, sent 50 at a time
         """
-        tlist = []
-        if tracks is not None:
-            tlist = [self._get_id("track", t) for t in tracks]
-        return self._put("me/tracks/?ids=" + ",".join(tlist))
+        return self._saved_items("add", "track", tracks)
 
     def current_user_saved_tracks_delete(self, tracks=None):
         """ Remove one or more tracks from the current user's
             "Your Music" library.
 
             Parameters:
-                - tracks - a list of track URIs, URLs or IDs
+                - tracks - a list of track URIs, URLs or IDs, sent 50 at a time
         """
-        tlist = []
-        if tracks is not None:
-            tlist = [self._get_id("track", t) for t in tracks]
-        return self._delete("me/tracks/?ids=" + ",".join(tlist))
+        return self._saved_items("delete", "track", tracks)
 
-    def current_user_saved_tracks_contains(self, tracks=None):
+    def current_user_saved_tracks_contains(self, tracks=None, unique=False):
         """ Check if one or more tracks is already saved in
             the current Spotify user’s “Your Music” library.
 
             Parameters:
-                - tracks - a list of track URIs, URLs or IDs
+                - tracks - a list of track URIs, URLs or IDs, checked 50 at a time
+                - unique - only check each item once; the result still
+                  has a boolean for every item given
         """
-        tlist = []
-        if tracks is not None:
-            tlist = [self._get_id("track", t) for t in tracks]
-        return self._get("me/tracks/contains?ids=" + ",".join(tlist))
+        return self._saved_items("contains", "track", tracks, unique)
 
     def current_user_saved_episodes(self, limit=20, offset=0, market=None):
         """ Gets a list of the episodes saved in the current authorized user's
@@ -1278,36 +1762,29 @@ class Spotify(object):
             "Your Music" library.
 
             Parameters:
-                - episodes - a list of episode URIs, URLs or IDs
+                - episodes - a list of episode URIs, URLs or IDs, sent 50 at a time
         """
-        elist = []
-        if episodes is not None:
-            elist = [self._get_id("episode", e) for e in episodes]
-        return self._put("me/episodes/?ids=" + ",".join(elist))
+        return self._saved_items("add", "episode", episodes)
 
     def current_user_saved_episodes_delete(self, episodes=None):
         """ Remove one or more episodes from the current user's
             "Your Music" library.
 
             Parameters:
-                - episodes - a list of episode URIs, URLs or IDs
+                - episodes - a list of episode URIs, URLs or IDs, sent 50 at a time
         """
-        elist = []
-        if episodes is not None:
-            elist = [self._get_id("episode", e) for e in episodes]
-        return self._delete("me/episodes/?ids=" + ",".join(elist))
+        return self._saved_items("delete", "episode", episodes)
 
-    def current_user_saved_episodes_contains(self, episodes=None):
+    def current_user_saved_episodes_contains(self, episodes=None, unique=False):
         """ Check if one or more episodes is already saved in
             the current Spotify user’s “Your Music” library.
 
             Parameters:
-                - episodes - a list of episode URIs, URLs or IDs
+                - episodes - a list of episode URIs, URLs or IDs, checked 50 at a time
+                - unique - only check each item once; the result still
+                  has a boolean for every item given
         """
-        elist = []
-        if episodes is not None:
-            elist = [self._get_id("episode", e) for e in episodes]
-        return self._get("me/episodes/contains?ids=" + ",".join(elist))
+        return self._saved_items("contains", "episode", episodes, unique)
 
     def current_user_saved_shows(self, limit=20, offset=0, market=None):
         """ Gets a list of the shows saved in the current authorized user's
@@ -1325,30 +1802,29 @@ class Spotify(object):
         """ Add one or more albums to the current user's
             "Your Music" library.
             Parameters:
-                - shows - a list of show URIs, URLs or IDs
+                - shows - a list of show URIs, URLs or IDs, sent 50 at a time
         """
-        slist = [self._get_id("show", s) for s in shows]
-        return self._put("me/shows?ids=" + ",".join(slist))
+        return self._saved_items("add", "show", shows)
 
     def current_user_saved_shows_delete(self, shows=[]):
         """ Remove one or more shows from the current user's
             "Your Music" library.
 
             Parameters:
-                - shows - a list of show URIs, URLs or IDs
+                - shows - a list of show URIs, URLs or IDs, sent 50 at a time
         """
-        slist = [self._get_id("show", s) for s in shows]
-        return self._delete("me/shows/?ids=" + ",".join(slist))
+        return self._saved_items("delete", "show", shows)
 
-    def current_user_saved_shows_contains(self, shows=[]):
+    def current_user_saved_shows_contains(self, shows=[], unique=False):
         """ Check if one or more shows is already saved in
             the current Spotify user’s “Your Music” library.
 
             Parameters:
-                - shows - a list of show URIs, URLs or IDs
+                - shows - a list of show URIs, URLs or IDs, checked 50 at a time
+                - unique - only check each item once; the result still
+                  has a boolean for every item given
         """
-        slist = [self._get_id("show", s) for s in shows]
-        return self._get("me/shows/contains?ids=" + ",".join(slist))
+        return self._saved_items("contains", "show", shows, unique)
 
     def current_user_followed_artists(self, limit=20, after=None):
         """ Gets a list of the artists followed by the current authorized user
@@ -1363,34 +1839,34 @@ class Spotify(object):
             "me/following", type="artist", limit=limit, after=after
         )
 
-    def current_user_following_artists(self, ids=None):
+    def current_user_following_artists(self, ids=None, unique=False):
         """ Check if the current user is following certain artists
 
             Returns list of booleans respective to ids
 
             Parameters:
-                - ids - a list of artist URIs, URLs or IDs
+                - ids - a list of artist URIs, URLs or IDs, which are checked
+                  50 at a time
+                - unique - only check each artist once; the result still has
+                  an entry for every id given
         """
-        idlist = []
-        if ids is not None:
-            idlist = [self._get_id("artist", i) for i in ids]
-        return self._get(
-            "me/following/contains", ids=",".join(idlist), type="artist"
+        return self._contains(
+            "me/following/contains", self._get_ids("artist", ids or []), 50, unique, type="artist"
         )
 
-    def current_user_following_users(self, ids=None):
+    def current_user_following_users(self, ids=None, unique=False):
         """ Check if the current user is following certain artists
 
             Returns list of booleans respective to ids
 
             Parameters:
-                - ids - a list of user URIs, URLs or IDs
+                - ids - a list of user URIs, URLs or IDs, which are checked
+                  50 at a time
+                - unique - only check each user once; the result still has
+                  an entry for every id given
         """
-        idlist = []
-        if ids is not None:
-            idlist = [self._get_id("user", i) for i in ids]
-        return self._get(
-            "me/following/contains", ids=",".join(idlist), type="user"
+        return self._contains(
+            "me/following/contains", self._get_ids("user", ids or []), 50, unique, type="user"
         )
 
     def current_user_top_artists(
@@ -1445,30 +1921,38 @@ class Spotify(object):
     def user_follow_artists(self, ids=[]):
         """ Follow one or more artists
             Parameters:
-                - ids - a list of artist IDs
+                - ids - a list of artist IDs, sent 50 at a time
         """
-        return self._put("me/following?type=artist&ids=" + ",".join(ids))
+        return self._send_batches(
+            self._put, "me/following", list(ids), 50, type="artist"
+        )
 
     def user_follow_users(self, ids=[]):
         """ Follow one or more users
             Parameters:
-                - ids - a list of user IDs
+                - ids - a list of user IDs, sent 50 at a time
         """
-        return self._put("me/following?type=user&ids=" + ",".join(ids))
+        return self._send_batches(
+            self._put, "me/following", list(ids), 50, type="user"
+        )
 
     def user_unfollow_artists(self, ids=[]):
         """ Unfollow one or more artists
             Parameters:
-                - ids - a list of artist IDs
+                - ids - a list of artist IDs, sent 50 at a time
         """
-        return self._delete("me/following?type=artist&ids=" + ",".join(ids))
+        return self._send_batches(
+            self._delete, "me/following", list(ids), 50, type="artist"
+        )
 
     def user_unfollow_users(self, ids=[]):
         """ Unfollow one or more users
             Parameters:
-                - ids - a list of user IDs
+                - ids - a list of user IDs, sent 50 at a time
         """
-        return self._delete("me/following?type=user&ids=" + ",".join(ids))
+        return self._send_batches(
+            self._delete, "me/following", list(ids), 50, type="user"
+        )
 
     def featured_playlists(
         self, locale=None, country=None, timestamp=None, limit=20, offset=0
@@ -1615,40 +2099,26 @@ class Spotify(object):
                     attributes listed in the documentation, these values
                     provide filters and targeting on results.
         """
+        if not (seed_artists or seed_genres or seed_tracks):
+            # raised like the 400 the API would answer with, without sending
+            # the request
+            raise SpotifyException(
+                400, -1,
+                "At least one of seed_artists, seed_genres or seed_tracks is required")
         params = dict(limit=limit)
         if seed_artists:
-            params["seed_artists"] = ",".join(
-                [self._get_id("artist", a) for a in seed_artists]
-            )
+            params["seed_artists"] = ",".join(self._get_ids("artist", seed_artists))
         if seed_genres:
             params["seed_genres"] = ",".join(seed_genres)
         if seed_tracks:
-            params["seed_tracks"] = ",".join(
-                [self._get_id("track", t) for t in seed_tracks]
-            )
+            params["seed_tracks"] = ",".join(self._get_ids("track", seed_tracks))
         if country:
             params["market"] = country
 
-        for attribute in [
-            "acousticness",
-            "danceability",
-            "duration_ms",
-            "energy",
-            "instrumentalness",
-            "key",
-            "liveness",
-            "loudness",
-            "mode",
-            "popularity",
-            "speechiness",
-            "tempo",
-            "time_signature",
-            "valence",
-        ]:
-            for prefix in ["min_", "max_", "target_"]:
-                param = prefix + attribute
-                if param in kwargs:
-                    params[param] = kwargs[param]
+        params.update(
+            (param, value) for param, value in kwargs.items()
+            if param in _RECOMMENDATION_PARAMS
+        )
         return self._get("recommendations", **params)
 
     def recommendation_genre_seeds(self):
@@ -1664,23 +2134,26 @@ class Spotify(object):
         trid = self._get_id("track", track_id)
         return self._get("audio-analysis/" + trid)
 
-    def audio_features(self, tracks=[]):
+    def audio_features(self, tracks=[], unique=False):
         """ Get audio features for one or multiple tracks based upon their Spotify IDs
             Parameters:
-                - tracks - a list of track URIs, URLs or IDs, maximum: 100 ids
+                - tracks - a list of track URIs, URLs or IDs, which are
+                  fetched in concurrent batches of 100
+                - unique - only request each track once; the result still
+                  has an entry for every track given
         """
         if isinstance(tracks, str):
-            trackid = self._get_id("track", tracks)
-            results = self._get("audio-features/?ids=" + trackid)
+            tlist = [self._get_id("track", tracks)]
         else:
-            tlist = [self._get_id("track", t) for t in tracks]
-            results = self._get("audio-features/?ids=" + ",".join(tlist))
-        # the response has changed, look for the new style first, and if
-        # its not there, fallback on the old style
-        if "audio_features" in results:
-            return results["audio_features"]
-        else:
-            return results
+            tlist = self._get_ids("track", tracks)
+        if not tlist:
+            return []
+        ids = _unique(tlist) if unique else tlist
+        features = self._get_several(
+            "audio-features", "audio_features", ids, 100)["audio_features"]
+        if unique:
+            return _expand(tlist, ids, features)
+        return features
 
     def devices(self):
         """ Get a list of user's available devices.
@@ -1749,18 +2222,15 @@ class Spotify(object):
         if uris is not None and not isinstance(uris, list):
             logger.warning("URIs must be a list")
             return
-        data = {}
-        if context_uri is not None:
-            data["context_uri"] = context_uri
-        if uris is not None:
-            data["uris"] = uris
-        if offset is not None:
-            data["offset"] = offset
-        if position_ms is not None:
-            data["position_ms"] = position_ms
-        return self._put(
-            self._append_device_id("me/player/play", device_id), payload=data
-        )
+        data = {
+            key: value for key, value in (
+                ("context_uri", context_uri),
+                ("uris", uris),
+                ("offset", offset),
+                ("position_ms", position_ms),
+            ) if value is not None
+        }
+        return self._put("me/player/play", payload=data, device_id=device_id)
 
     def pause_playback(self, device_id=None):
         """ Pause user's playback.
@@ -1768,7 +2238,7 @@ class Spotify(object):
             Parameters:
                 - device_id - device target for playback
         """
-        return self._put(self._append_device_id("me/player/pause", device_id))
+        return self._put("me/player/pause", device_id=device_id)
 
     def next_track(self, device_id=None):
         """ Skip user's playback to next track.
@@ -1776,7 +2246,7 @@ class Spotify(object):
             Parameters:
                 - device_id - device target for playback
         """
-        return self._post(self._append_device_id("me/player/next", device_id))
+        return self._post("me/player/next", device_id=device_id)
 
     def previous_track(self, device_id=None):
         """ Skip user's playback to previous track.
@@ -1784,9 +2254,7 @@ class Spotify(object):
             Parameters:
                 - device_id - device target for playback
         """
-        return self._post(
-            self._append_device_id("me/player/previous", device_id)
-        )
+        return self._post("me/player/previous", device_id=device_id)
 
     def seek_track(self, position_ms, device_id=None):
         """ Seek to position in current track.
@@ -1798,11 +2266,7 @@ class Spotify(object):
         if not isinstance(position_ms, int):
             logger.warning("Position_ms must be an integer")
             return
-        return self._put(
-            self._append_device_id(
-                "me/player/seek?position_ms=%s" % position_ms, device_id
-            )
-        )
+        return self._put("me/player/seek", position_ms=position_ms, device_id=device_id)
 
     def repeat(self, state, device_id=None):
         """ Set repeat mode for playback.
@@ -1811,14 +2275,10 @@ class Spotify(object):
                 - state - `track`, `context`, or `off`
                 - device_id - device target for playback
         """
-        if state not in ["track", "context", "off"]:
+        if state not in _REPEAT_STATES:
             logger.warning("Invalid state")
             return
-        self._put(
-            self._append_device_id(
-                "me/player/repeat?state=%s" % state, device_id
-            )
-        )
+        self._put("me/player/repeat", state=state, device_id=device_id)
 
     def volume(self, volume_percent, device_id=None):
         """ Set playback volume.
@@ -1833,12 +2293,7 @@ class Spotify(object):
         if volume_percent < 0 or volume_percent > 100:
             logger.warning("Volume must be between 0 and 100, inclusive")
             return
-        self._put(
-            self._append_device_id(
-                "me/player/volume?volume_percent=%s" % volume_percent,
-                device_id,
-            )
-        )
+        self._put("me/player/volume", volume_percent=volume_percent, device_id=device_id)
 
     def shuffle(self, state, device_id=None):
         """ Toggle playback shuffling.
@@ -1850,12 +2305,7 @@ class Spotify(object):
         if not isinstance(state, bool):
             logger.warning("state must be a boolean")
             return
-        state = str(state).lower()
-        self._put(
-            self._append_device_id(
-                "me/player/shuffle?state=%s" % state, device_id
-            )
-        )
+        self._put("me/player/shuffle", state="true" if state else "false", device_id=device_id)
 
     def add_to_queue(self, uri, device_id=None):
         """ Adds a song to the end of a user's queue
@@ -1873,13 +2323,7 @@ class Spotify(object):
         """
 
         uri = self._get_uri("track", uri)
-
-        endpoint = "me/player/queue?uri=%s" % uri
-
-        if device_id is not None:
-            endpoint += "&device_id=%s" % device_id
-
-        return self._post(endpoint)
+        return self._post("me/player/queue", uri=uri, device_id=device_id)
 
     def available_markets(self):
         """ Get the list of markets where Spotify is available.
@@ -1888,43 +2332,55 @@ class Spotify(object):
         """
         return self._get("markets")
 
-    def _append_device_id(self, path, device_id):
-        """ Append device ID to API path.
-
-            Parameters:
-                - device_id - device id to append
-        """
-        if device_id:
-            if "?" in path:
-                path += "&device_id=%s" % device_id
-            else:
-                path += "?device_id=%s" % device_id
-        return path
-
     def _get_id(self, type, id):
-        fields = id.split(":")
-        if len(fields) >= 3:
-            if type != fields[-2]:
-                logger.warning('Expected id of type %s but found type %s %s',
-                               type, fields[-2], id)
-            return fields[-1]
-        fields = id.split("/")
-        if len(fields) >= 3:
-            itype = fields[-2]
-            if type != itype:
-                logger.warning('Expected id of type %s but found type %s %s',
-                               type, itype, id)
-            return fields[-1].split("?")[0]
-        return id
+        if _BASE62_ID_RE.match(id):
+            return id
+        if id.startswith("spotify:" + type + ":"):
+            # a URI of the expected type, which needs no type check
+            return id.rpartition(":")[2]
+        # the type and id are the last two fields of a URI (also of the old
+        # spotify:user:<user>:playlist:<id> ones), or else of a URL
+        head, _, found = id.rpartition(":")
+        if ":" in head:
+            itype = head.rpartition(":")[2]
+        else:
+            head, _, found = id.rpartition("/")
+            if "/" not in head:
+                return id
+            itype = head.rpartition("/")[2]
+            found = found.partition("?")[0]
+        if type != itype:
+            logger.warning('Expected id of type %s but found type %s %s',
+                           type, itype, id)
+        return found
 
     def _get_uri(self, type, id):
-        if self._is_uri(id):
+        prefix = "spotify:" + type + ":"
+        if id.startswith(prefix) or self._is_uri(id):
             return id
-        else:
-            return "spotify:" + type + ":" + self._get_id(type, id)
+        if _BASE62_ID_RE.match(id):
+            return prefix + id
+        return prefix + self._get_id(type, id)
 
     def _is_uri(self, uri):
-        return uri.startswith("spotify:") and len(uri.split(':')) == 3
+        return uri.startswith("spotify:") and uri.count(":") == 2
+
+    def _get_ids(self, type, ids):
+        """ Returns the ids of several URIs, URLs or IDs of the same type,
+            only parsing the ones that aren't bare IDs.
+        """
+        is_id = _BASE62_ID_RE.match
+        get_id = self._get_id
+        return [id if is_id(id) else get_id(type, id) for id in ids]
+
+    def _get_uris(self, type, ids):
+        """ Returns the URIs of several URIs, URLs or IDs of the same type,
+            only parsing the ones that aren't bare IDs.
+        """
+        prefix = "spotify:" + type + ":"
+        is_id = _BASE62_ID_RE.match
+        get_uri = self._get_uri
+        return [prefix + id if is_id(id) else get_uri(type, id) for id in ids]
 
     def _search_multiple_markets(self, q, limit, offset, type, markets, total):
         if total and limit > total:
@@ -1935,22 +2391,42 @@ class Spotify(object):
                 UserWarning,
             )
 
+        if not total:
+            # without a `total` every market is searched, so the requests
+            # don't depend on each other and can be sent concurrently
+            def search(market):
+                return self._get(
+                    "search", q=q, limit=limit, offset=offset, type=type, market=market
+                )
+            return dict(zip(markets, self.parallel_map(search, markets)))
+
+        def search_with_limit(market_and_limit):
+            market, market_limit = market_and_limit
+            return self._get(
+                "search", q=q, limit=market_limit, offset=offset, type=type, market=market
+            )
+
         results = {}
         first_type = type.split(",")[0] + 's'
         count = 0
-
-        for country in markets:
-            result = self._get(
-                "search", q=q, limit=limit, offset=offset, type=type, market=country
-            )
-            results[country] = result
-
-            count += len(result[first_type]['items'])
-            if total and count >= total:
-                break
-            if total and limit > total - count:
-                # when approaching `total` results, adjust `limit` to not request more
-                # items than needed
-                limit = total - count
+        markets = list(markets)
+
+        while markets and count < total:
+            # search at once as many markets as are needed to reach `total`
+            # if each of them returns a full page, adjusting the last `limit`
+            # to not request more items than needed; markets returning fewer
+            # items are made up for by the next wave
+            wave = []
+            needed = total - count
+            for market in markets[:max(self.max_workers, 1)]:
+                if needed <= 0:
+                    break
+                wave.append((market, min(limit, needed)))
+                needed -= limit
+            markets = markets[len(wave):]
+
+            for (market, _), result in zip(wave, self.parallel_map(search_with_limit, wave)):
+                results[market] = result
+                count += len(result[first_type]['items'])
 
         return results
@@ -0,0 +1,59 @@
+__all__ = ["RateLimiter"]
+
+import threading
+import time
+
+# time.monotonic isn't available on Python 2
+_clock = getattr(time, "monotonic", time.time)
+
+
+class RateLimiter(object):
+    """
+    A leaky bucket that spaces out requests so that no more than `rate`
+    requests per second are sent on average, with bursts of up to
+    `capacity` requests.
+
+    It is thread safe, so a single instance can pace every thread of a
+    `Spotify` client, or several clients sharing the same credentials.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: Number of requests per second
+        :param capacity:
+            Number of requests that can be sent at once before they are
+            spaced out (optional, defaults to one second worth of requests)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity or rate, 1)
+        self._lock = threading.Lock()
+        # when the bucket will be empty again, and until when it is closed
+        self._empty_at = 0
+        self._paused_until = 0
+
+    def acquire(self):
+        """
+        Blocks until a request can be sent.
+        """
+        interval = 1.0 / self.rate
+        with self._lock:
+            now = _clock()
+            send_at = max(now, self._paused_until,
+                          self._empty_at - (self.capacity - 1) * interval)
+            self._empty_at = max(self._empty_at, send_at) + interval
+        # sleep outside the lock, so other threads can reserve later slots
+        while send_at > now:
+            time.sleep(send_at - now)
+            now = _clock()
+            # the bucket may have been paused while this thread was waiting
+            send_at = max(send_at, self._paused_until)
+
+    def pause(self, seconds):
+        """
+        Holds back every request for the given number of seconds, e.g.
+        as long as the Retry-After header of a 429 response asks for.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, _clock() + seconds)
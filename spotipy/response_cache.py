@@ -0,0 +1,139 @@
+__all__ = ['ResponseCache', 'MemoryResponseCache', 'SQLiteResponseCache']
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# imported when an SQLiteResponseCache is created, so that importing spotipy
+# neither loads sqlite3 nor fails on Pythons built without it
+sqlite3 = None
+
+
+def _import_sqlite3():
+    global sqlite3
+    if sqlite3 is None:
+        import sqlite3 as module
+        sqlite3 = module
+
+
+class ResponseCache():
+    """
+    An abstraction layer for caching responses of the Web API, so that
+    the client can revalidate them with the ETag the API sent instead of
+    downloading them again.
+
+    A cached response is a dictionary with the response's "etag", its
+    "body", the raw bytes of the JSON document, and optionally the time
+    (as returned by time.time) until which it is fresh, "expires_at".
+
+    Custom extensions of this class must implement get_cached_response
+    and save_response_to_cache methods with the same input and output
+    structure as the ResponseCache class. They may be called from several
+    threads at once.
+    """
+
+    def get_cached_response(self, key):
+        """
+        Get and return the response cached under `key`, or None.
+        """
+        raise NotImplementedError()
+
+    def save_response_to_cache(self, key, response_info):
+        """
+        Save a response dictionary object under `key` and return None.
+        """
+        raise NotImplementedError()
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    A response cache that keeps the most recently used responses in memory.
+    They will be lost when this instance is freed.
+    """
+
+    def __init__(self, max_size=256):
+        """
+        Parameters:
+            * max_size: The number of responses to keep.
+        """
+        self.max_size = max_size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_cached_response(self, key):
+        with self._lock:
+            response_info = self._responses.pop(key, None)
+            if response_info is not None:
+                self._responses[key] = response_info
+            return response_info
+
+    def save_response_to_cache(self, key, response_info):
+        with self._lock:
+            self._responses.pop(key, None)
+            self._responses[key] = response_info
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    A response cache that stores responses in an SQLite database on disk,
+    so they can be revalidated by later runs of the program too.
+    """
+
+    def __init__(self, cache_path=".cache-responses.sqlite", max_size=10000):
+        """
+        Parameters:
+            * cache_path: The path of the database file, created if it
+                          doesn't exist.
+            * max_size: The number of responses to keep. The ones saved
+                        longest ago are removed first.
+        """
+        _import_sqlite3()
+        self.cache_path = cache_path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, etag TEXT, body BLOB, saved_at REAL, "
+                "expires_at REAL)")
+
+    def get_cached_response(self, key):
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT etag, body, expires_at FROM responses WHERE key = ?",
+                    (key,)).fetchone()
+        except sqlite3.Error:
+            logger.warning("Couldn't read response cache at: %s", self.cache_path)
+            return None
+        if row is None:
+            return None
+        response_info = {"etag": row[0], "body": bytes(row[1])}
+        if row[2] is not None:
+            response_info["expires_at"] = row[2]
+        return response_info
+
+    def save_response_to_cache(self, key, response_info):
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (key, response_info["etag"], sqlite3.Binary(response_info["body"]),
+                     time.time(), response_info.get("expires_at")))
+                # a saved response replaces its row, so the rowids are in
+                # the order the responses were saved
+                excess = self._connection.execute(
+                    "SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_size
+                if excess > 0:
+                    self._connection.execute(
+                        "DELETE FROM responses WHERE rowid IN ("
+                        "SELECT rowid FROM responses ORDER BY rowid LIMIT ?)",
+                        (excess,))
+        except sqlite3.Error:
+            logger.warning("Couldn't write response to cache at: %s", self.cache_path)
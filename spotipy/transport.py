@@ -0,0 +1,102 @@
+__all__ = ["HTTPXSession"]
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# imported when an HTTPXSession is created, so that importing spotipy
+# doesn't pay for loading httpx when it isn't used
+httpx = None
+
+
+def _import_httpx():
+    global httpx
+    if httpx is None:
+        try:
+            import httpx as module
+        except ImportError:
+            raise ImportError(
+                "The httpx transport requires httpx: pip install httpx[http2]")
+        httpx = module
+
+
+class HTTPXSession(object):
+    """
+    Sends requests with httpx over HTTP/2, so that concurrent requests to
+    the Web API are multiplexed over a single connection.
+
+    Implements the part of the `requests.Session` interface used by the
+    `Spotify` client and returns `requests.Response` objects, so error
+    handling doesn't depend on the transport. A single instance can be
+    passed as the `requests_session` of several clients, so that they
+    share its connection. Requires `pip install httpx[http2]`.
+    """
+
+    def __init__(self, headers=None, proxies=None, retries=0, max_connections=None,
+                 client=None):
+        """
+        :param headers: Headers sent with every request (optional)
+        :param proxies:
+            Proxies in the format used by Requests, e.g.
+            {"https": "http://10.10.1.10:1080"} (optional)
+        :param retries: Number of times to retry failed connections
+        :param max_connections: Maximum number of connections to open
+        :param client:
+            An `httpx.Client` to send the requests with instead of creating
+            one from the other arguments (optional)
+        """
+        _import_httpx()
+        if client is not None:
+            self._client = client
+            return
+
+        def transport(proxy=None):
+            # older httpx releases only take an httpx.Proxy, not a URL
+            return httpx.HTTPTransport(http2=True, retries=retries,
+                                       proxy=httpx.Proxy(proxy) if proxy else None)
+
+        # httpx takes proxies per URL pattern when the client is created
+        mounts = {
+            (scheme if "://" in scheme else scheme + "://"): transport(proxy)
+            for scheme, proxy in (proxies or {}).items()
+        }
+        self._client = httpx.Client(
+            headers=headers,
+            transport=transport(),
+            mounts=mounts,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            follow_redirects=True,
+        )
+
+    @property
+    def headers(self):
+        return self._client.headers
+
+    def request(self, method, url, params=None, data=None, headers=None,
+                timeout=None, proxies=None):
+        # Requests takes separate timeouts as a (connect, read) tuple
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(None, connect=timeout[0], read=timeout[1])
+        try:
+            response = self._client.request(
+                method, url, params=params, content=data, headers=headers,
+                timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e)
+        return self._to_requests_response(response)
+
+    def close(self):
+        self._client.close()
+
+    @staticmethod
+    def _to_requests_response(response):
+        result = requests.Response()
+        result.status_code = response.status_code
+        result.reason = response.reason_phrase
+        result.url = str(response.url)
+        result.headers = CaseInsensitiveDict(response.headers)
+        result.encoding = response.encoding
+        result._content = response.content
+        return result
@@ -1,15 +1,20 @@
 # -*- coding: utf-8 -*-
 
 from spotipy import (
+    CLIENT_CREDS_ENV_VARS as CCEV,
     Spotify,
     SpotifyClientCredentials,
     SpotifyException
 )
+import os
 import spotipy
 import unittest
 import requests
+import warnings
 
 
+@unittest.skipUnless(os.getenv(CCEV['client_id']) and os.getenv(CCEV['client_secret']),
+                     "client credentials not provided")
 class AuthTestSpotipy(unittest.TestCase):
     """
     These tests require client authentication - provide client credentials
@@ -58,7 +63,8 @@ class AuthTestSpotipy(unittest.TestCase):
     @classmethod
     def setUpClass(self):
         self.spotify = Spotify(
-            client_credentials_manager=SpotifyClientCredentials())
+            client_credentials_manager=SpotifyClientCredentials(),
+            transport=os.getenv("SPOTIPY_TEST_TRANSPORT", "requests"))
         self.spotify.trace = False
 
     def test_audio_analysis(self):
@@ -124,18 +130,13 @@ class AuthTestSpotipy(unittest.TestCase):
         self.assertTrue('albums' in results)
         self.assertTrue(len(results['albums']) == 2)
 
-    def test_track_urn(self):
-        track = self.spotify.track(self.creep_urn)
-        self.assertTrue(track['name'] == 'Creep')
-
-    def test_track_id(self):
-        track = self.spotify.track(self.creep_id)
-        self.assertTrue(track['name'] == 'Creep')
-        self.assertTrue(track['popularity'] > 0)
-
-    def test_track_url(self):
-        track = self.spotify.track(self.creep_url)
-        self.assertTrue(track['name'] == 'Creep')
+    def test_track_urn_id_and_url(self):
+        # the same track in each form, fetched concurrently
+        tracks = self.spotify.parallel_map(
+            self.spotify.track, [self.creep_urn, self.creep_id, self.creep_url])
+        for track in tracks:
+            self.assertTrue(track['name'] == 'Creep')
+            self.assertTrue(track['popularity'] > 0)
 
     def test_track_bad_urn(self):
         try:
@@ -163,17 +164,14 @@ class AuthTestSpotipy(unittest.TestCase):
                 found = True
         self.assertTrue(found)
 
-    def test_artist_search(self):
-        results = self.spotify.search(q='weezer', type='artist')
-        self.assertTrue('artists' in results)
-        self.assertTrue(len(results['artists']['items']) > 0)
-        self.assertTrue(results['artists']['items'][0]['name'] == 'Weezer')
+    def test_artist_search_with_and_without_market(self):
+        def search(market):
+            return self.spotify.search(q='weezer', type='artist', market=market)
 
-    def test_artist_search_with_market(self):
-        results = self.spotify.search(q='weezer', type='artist', market='GB')
-        self.assertTrue('artists' in results)
-        self.assertTrue(len(results['artists']['items']) > 0)
-        self.assertTrue(results['artists']['items'][0]['name'] == 'Weezer')
+        for results in self.spotify.parallel_map(search, [None, 'GB']):
+            self.assertTrue('artists' in results)
+            self.assertTrue(len(results['artists']['items']) > 0)
+            self.assertTrue(results['artists']['items'][0]['name'] == 'Weezer')
 
     def test_artist_search_with_multiple_markets(self):
         total = 5
@@ -279,17 +277,13 @@ class AuthTestSpotipy(unittest.TestCase):
         except SpotifyException:
             self.assertTrue(True)
 
-    def test_show_urn(self):
-        show = self.spotify.show(self.heavyweight_urn, market="US")
-        self.assertTrue(show['name'] == 'Heavyweight')
-
-    def test_show_id(self):
-        show = self.spotify.show(self.heavyweight_id, market="US")
-        self.assertTrue(show['name'] == 'Heavyweight')
-
-    def test_show_url(self):
-        show = self.spotify.show(self.heavyweight_url, market="US")
-        self.assertTrue(show['name'] == 'Heavyweight')
+    def test_show_urn_id_and_url(self):
+        # the same show in each form, fetched concurrently
+        shows = self.spotify.parallel_map(
+            lambda show_id: self.spotify.show(show_id, market="US"),
+            [self.heavyweight_urn, self.heavyweight_id, self.heavyweight_url])
+        for show in shows:
+            self.assertTrue(show['name'] == 'Heavyweight')
 
     def test_show_bad_urn(self):
         with self.assertRaises(SpotifyException):
@@ -316,17 +310,13 @@ class AuthTestSpotipy(unittest.TestCase):
 
         self.assertEqual(received, total)
 
-    def test_episode_urn(self):
-        episode = self.spotify.episode(self.heavyweight_ep1_urn, market="US")
-        self.assertTrue(episode['name'] == '#1 Buzz')
-
-    def test_episode_id(self):
-        episode = self.spotify.episode(self.heavyweight_ep1_id, market="US")
-        self.assertTrue(episode['name'] == '#1 Buzz')
-
-    def test_episode_url(self):
-        episode = self.spotify.episode(self.heavyweight_ep1_url, market="US")
-        self.assertTrue(episode['name'] == '#1 Buzz')
+    def test_episode_urn_id_and_url(self):
+        # the same episode in each form, fetched concurrently
+        episodes = self.spotify.parallel_map(
+            lambda episode_id: self.spotify.episode(episode_id, market="US"),
+            [self.heavyweight_ep1_urn, self.heavyweight_ep1_id, self.heavyweight_ep1_url])
+        for episode in episodes:
+            self.assertTrue(episode['name'] == '#1 Buzz')
 
     def test_episode_bad_urn(self):
         with self.assertRaises(SpotifyException):
@@ -358,10 +348,13 @@ class AuthTestSpotipy(unittest.TestCase):
         sess.close()
 
     def test_force_no_requests_session(self):
-        with_no_session = spotipy.Spotify(
-            client_credentials_manager=SpotifyClientCredentials(),
-            requests_session=False)
-        self.assertNotIsInstance(with_no_session._session, requests.Session)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            with_no_session = spotipy.Spotify(
+                client_credentials_manager=SpotifyClientCredentials(),
+                requests_session=False)
+        self.assertTrue(any(issubclass(w.category, DeprecationWarning) for w in caught))
+        self.assertIsInstance(with_no_session._session, requests.Session)
         user = with_no_session.user(user="akx")
         self.assertEqual(user["uri"], "spotify:user:akx")
 
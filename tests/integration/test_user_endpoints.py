@@ -2,16 +2,75 @@ import os
 
 from spotipy import (
     CLIENT_CREDS_ENV_VARS as CCEV,
-    prompt_for_user_token,
+    CacheFileHandler,
+    MemoryCacheHandler,
     Spotify,
     SpotifyException,
     SpotifyImplicitGrant,
+    SpotifyOAuth,
     SpotifyPKCE
 )
 import unittest
 from tests import helpers
 
+# the scopes the test classes authorized with SpotifyOAuth need, so they
+# can share a token
+SCOPE = (
+    'playlist-modify-public '
+    'user-library-read '
+    'user-follow-read '
+    'user-library-modify '
+    'user-read-private '
+    'user-top-read '
+    'user-follow-modify '
+    'user-read-recently-played '
+    'ugc-image-upload '
+    'user-read-playback-state'
+)
 
+# the scopes of the implicit grant and PKCE tests
+FOLLOW_SCOPE = 'user-follow-read user-follow-modify'
+
+# set SPOTIPY_TEST_TRANSPORT=httpx to run the tests over HTTP/2
+TRANSPORT = os.getenv('SPOTIPY_TEST_TRANSPORT', 'requests')
+
+# skips the tests, rather than failing them in setUpClass, when the
+# credentials of a test user aren't provided
+requires_user_credentials = unittest.skipUnless(
+    all(os.getenv(var) for var in CCEV.values()), "user credentials not provided")
+
+_auth_manager = None
+_spotify = None
+
+
+def _get_auth_manager():
+    """ Returns an auth manager for the test user. The token is read from
+        (or refreshed into) the cache file once per test run and then kept
+        in memory, so the test classes don't read the file again.
+    """
+    global _auth_manager
+    if _auth_manager is None:
+        file_auth_manager = SpotifyOAuth(
+            scope=SCOPE,
+            cache_handler=CacheFileHandler(username=os.getenv(CCEV['client_username'])))
+        file_auth_manager.get_access_token(as_dict=False)
+        token_info = file_auth_manager.cache_handler.get_cached_token()
+        _auth_manager = SpotifyOAuth(
+            scope=SCOPE, cache_handler=MemoryCacheHandler(token_info=token_info))
+    return _auth_manager
+
+
+def _get_spotify():
+    """ Returns a client authorized for the test user, shared by the test
+        classes so that they also share its connections.
+    """
+    global _spotify
+    if _spotify is None:
+        _spotify = Spotify(auth_manager=_get_auth_manager(), transport=TRANSPORT)
+    return _spotify
+
+
+@requires_user_credentials
 class SpotipyPlaylistApiTest(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -35,33 +94,21 @@ class SpotipyPlaylistApiTest(unittest.TestCase):
             "spotify:episode:7cRcsGYYRUFo1OF3RgRzdx",
         ]
 
-        scope = (
-            'playlist-modify-public '
-            'user-library-read '
-            'user-follow-read '
-            'user-library-modify '
-            'user-read-private '
-            'user-top-read '
-            'user-follow-modify '
-            'user-read-recently-played '
-            'ugc-image-upload '
-            'user-read-playback-state'
-        )
-
-        token = prompt_for_user_token(cls.username, scope=scope)
-
-        cls.spotify = Spotify(auth=token)
-        cls.spotify_no_retry = Spotify(auth=token, retries=0)
+        cls.spotify = _get_spotify()
+        cls.spotify_no_retry = Spotify(auth_manager=_get_auth_manager(), retries=0,
+                                       transport=TRANSPORT)
+        # the playlist is kept between runs, and only emptied here in case
+        # an earlier run stopped before a test cleared it
         cls.new_playlist_name = 'spotipy-playlist-test'
         cls.new_playlist = helpers.get_spotify_playlist(
-            cls.spotify, cls.new_playlist_name, cls.username) or \
-            cls.spotify.user_playlist_create(cls.username, cls.new_playlist_name)
+            cls.spotify, cls.new_playlist_name, cls.username)
+        if cls.new_playlist is None:
+            cls.new_playlist = cls.spotify.user_playlist_create(
+                cls.username, cls.new_playlist_name)
+        elif cls.new_playlist['tracks']['total']:
+            cls.spotify.playlist_replace_items(cls.new_playlist['id'], [])
         cls.new_playlist_uri = cls.new_playlist['uri']
 
-    @classmethod
-    def tearDownClass(cls):
-        cls.spotify.current_user_unfollow_playlist(cls.new_playlist['id'])
-
     def test_user_playlists(self):
         playlists = self.spotify.user_playlists(self.username, limit=5)
         self.assertTrue('items' in playlists)
@@ -99,8 +146,8 @@ class SpotipyPlaylistApiTest(unittest.TestCase):
         self.assertFalse(follows[0], 'is no longer following')
 
     def test_playlist_replace_items(self):
-        # add tracks to playlist
-        self.spotify.playlist_add_items(
+        # fill the playlist with tracks
+        self.spotify.playlist_replace_items(
             self.new_playlist['id'], self.four_tracks)
         playlist = self.spotify.playlist(self.new_playlist['id'])
         self.assertEqual(playlist['tracks']['total'], 4)
@@ -113,10 +160,7 @@ class SpotipyPlaylistApiTest(unittest.TestCase):
         self.assertEqual(playlist['tracks']['total'], 3)
         self.assertEqual(len(playlist['tracks']['items']), 3)
 
-        self.spotify.playlist_remove_all_occurrences_of_items(
-            playlist['id'], self.other_tracks)
-        playlist = self.spotify.playlist(self.new_playlist['id'])
-        self.assertEqual(playlist["tracks"]["total"], 0)
+        self.spotify.playlist_replace_items(self.new_playlist['id'], [])
 
     def test_get_playlist_by_id(self):
         pl = self.spotify.playlist(self.new_playlist['id'])
@@ -146,10 +190,29 @@ class SpotipyPlaylistApiTest(unittest.TestCase):
         pl = self.spotify.playlist_items(self.new_playlist['id'], limit=2)
         self.assertEqual(len(pl["items"]), 2)
 
+        self.spotify.playlist_replace_items(self.new_playlist['id'], [])
+
+    def test_playlist_remove_all_occurrences_of_items(self):
+        # more than 100 different tracks, so they are removed in batches
+        pages = self.spotify.parallel_map(
+            lambda offset: self.spotify.search(
+                'year:2020', type='track', limit=50, offset=offset),
+            [0, 50, 100])
+        tracks = []
+        for page in pages:
+            for track in page['tracks']['items']:
+                if track['uri'] not in tracks:
+                    tracks.append(track['uri'])
+        self.assertGreater(len(tracks), 100)
+
+        self.spotify.playlist_add_items(self.new_playlist['id'], tracks)
+        playlist = self.spotify.playlist_items(self.new_playlist['id'], limit=1)
+        self.assertEqual(playlist['total'], len(tracks))
+
         self.spotify.playlist_remove_all_occurrences_of_items(
-            self.new_playlist['id'], self.other_tracks)
+            self.new_playlist['id'], tracks)
         playlist = self.spotify.playlist_items(self.new_playlist['id'])
-        self.assertEqual(playlist["total"], 0)
+        self.assertEqual(playlist['total'], 0)
 
     def test_playlist_add_episodes(self):
         # add episodes to playlist
@@ -162,10 +225,7 @@ class SpotipyPlaylistApiTest(unittest.TestCase):
         pl = self.spotify.playlist_items(self.new_playlist['id'], limit=2)
         self.assertEqual(len(pl["items"]), 2)
 
-        self.spotify.playlist_remove_all_occurrences_of_items(
-            self.new_playlist['id'], self.four_episodes)
-        playlist = self.spotify.playlist_items(self.new_playlist['id'])
-        self.assertEqual(playlist["total"], 0)
+        self.spotify.playlist_replace_items(self.new_playlist['id'], [])
 
     def test_playlist_cover_image(self):
         # From https://dog.ceo/api/breeds/image/random
@@ -204,6 +264,7 @@ class SpotipyPlaylistApiTest(unittest.TestCase):
         self.assertEqual(pl["tracks"]["total"], 0)
 
 
+@requires_user_credentials
 class SpotipyLibraryApiTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -218,23 +279,7 @@ class SpotipyLibraryApiTests(unittest.TestCase):
             "spotify:episode:5LEFdZ9pYh99wSz7Go2D0g"
         ]
         cls.username = os.getenv(CCEV['client_username'])
-
-        scope = (
-            'playlist-modify-public '
-            'user-library-read '
-            'user-follow-read '
-            'user-library-modify '
-            'user-read-private '
-            'user-top-read '
-            'user-follow-modify '
-            'user-read-recently-played '
-            'ugc-image-upload '
-            'user-read-playback-state'
-        )
-
-        token = prompt_for_user_token(cls.username, scope=scope)
-
-        cls.spotify = Spotify(auth=token)
+        cls.spotify = _get_spotify()
 
     def test_track_bad_id(self):
         with self.assertRaises(SpotifyException):
@@ -290,27 +335,12 @@ class SpotipyLibraryApiTests(unittest.TestCase):
         self.assertEqual(resp, [False, False])
 
 
+@requires_user_credentials
 class SpotipyUserApiTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.username = os.getenv(CCEV['client_username'])
-
-        scope = (
-            'playlist-modify-public '
-            'user-library-read '
-            'user-follow-read '
-            'user-library-modify '
-            'user-read-private '
-            'user-top-read '
-            'user-follow-modify '
-            'user-read-recently-played '
-            'ugc-image-upload '
-            'user-read-playback-state'
-        )
-
-        token = prompt_for_user_token(cls.username, scope=scope)
-
-        cls.spotify = Spotify(auth=token)
+        cls.spotify = _get_spotify()
 
     def test_basic_user_profile(self):
         user = self.spotify.user(self.username)
@@ -335,12 +365,11 @@ class SpotipyUserApiTests(unittest.TestCase):
         self.assertGreaterEqual(len(items), 0)
 
 
+@requires_user_credentials
 class SpotipyBrowseApiTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        username = os.getenv(CCEV['client_username'])
-        token = prompt_for_user_token(username)
-        cls.spotify = Spotify(auth=token)
+        cls.spotify = _get_spotify()
 
     def test_category(self):
         response = self.spotify.category('rock')
@@ -351,13 +380,8 @@ class SpotipyBrowseApiTests(unittest.TestCase):
         self.assertGreater(len(response['categories']), 0)
 
     def test_category_playlists(self):
-        response = self.spotify.categories()
-        category = 'rock'
-        for cat in response['categories']['items']:
-            cat_id = cat['id']
-            if cat_id == category:
-                response = self.spotify.category_playlists(category_id=cat_id)
-                self.assertGreater(len(response['playlists']["items"]), 0)
+        response = self.spotify.category_playlists(category_id='rock')
+        self.assertGreater(len(response['playlists']["items"]), 0)
 
     def test_new_releases(self):
         response = self.spotify.new_releases()
@@ -368,27 +392,12 @@ class SpotipyBrowseApiTests(unittest.TestCase):
         self.assertGreater(len(response['playlists']), 0)
 
 
+@requires_user_credentials
 class SpotipyFollowApiTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.username = os.getenv(CCEV['client_username'])
-
-        scope = (
-            'playlist-modify-public '
-            'user-library-read '
-            'user-follow-read '
-            'user-library-modify '
-            'user-read-private '
-            'user-top-read '
-            'user-follow-modify '
-            'user-read-recently-played '
-            'ugc-image-upload '
-            'user-read-playback-state'
-        )
-
-        token = prompt_for_user_token(cls.username, scope=scope)
-
-        cls.spotify = Spotify(auth=token)
+        cls.spotify = _get_spotify()
 
     def test_current_user_follows(self):
         response = self.spotify.current_user_followed_artists()
@@ -423,27 +432,12 @@ class SpotipyFollowApiTests(unittest.TestCase):
         self.assertFalse(any(self.spotify.current_user_following_users(users)))
 
 
+@requires_user_credentials
 class SpotipyPlayerApiTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.username = os.getenv(CCEV['client_username'])
-
-        scope = (
-            'playlist-modify-public '
-            'user-library-read '
-            'user-follow-read '
-            'user-library-modify '
-            'user-read-private '
-            'user-top-read '
-            'user-follow-modify '
-            'user-read-recently-played '
-            'ugc-image-upload '
-            'user-read-playback-state'
-        )
-
-        token = prompt_for_user_token(cls.username, scope=scope)
-
-        cls.spotify = Spotify(auth=token)
+        cls.spotify = _get_spotify()
 
     def test_devices(self):
         # No devices playing by default
@@ -457,16 +451,13 @@ class SpotipyPlayerApiTests(unittest.TestCase):
         # not much more to test if account is inactive and has no recently played tracks
 
 
+@requires_user_credentials
 class SpotipyImplicitGrantTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        scope = (
-            'user-follow-read '
-            'user-follow-modify '
-        )
-        auth_manager = SpotifyImplicitGrant(scope=scope,
+        auth_manager = SpotifyImplicitGrant(scope=FOLLOW_SCOPE,
                                             cache_path=".cache-implicittest")
-        cls.spotify = Spotify(auth_manager=auth_manager)
+        cls.spotify = Spotify(auth_manager=auth_manager, transport=TRANSPORT)
 
     def test_user_follows_and_unfollows_artist(self):
         # Initially follows 1 artist
@@ -490,16 +481,13 @@ class SpotipyImplicitGrantTests(unittest.TestCase):
         self.assertEqual(c_user['display_name'], user['display_name'])
 
 
+@requires_user_credentials
 class SpotifyPKCETests(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        scope = (
-            'user-follow-read '
-            'user-follow-modify '
-        )
-        auth_manager = SpotifyPKCE(scope=scope, cache_path=".cache-pkcetest")
-        cls.spotify = Spotify(auth_manager=auth_manager)
+        auth_manager = SpotifyPKCE(scope=FOLLOW_SCOPE, cache_path=".cache-pkcetest")
+        cls.spotify = Spotify(auth_manager=auth_manager, transport=TRANSPORT)
 
     def test_user_follows_and_unfollows_artist(self):
         # Initially follows 1 artist
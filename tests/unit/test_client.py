@@ -0,0 +1,948 @@
+# -*- coding: utf-8 -*-
+import json
+import re
+import threading
+import time
+import unittest
+
+import requests
+
+from spotipy import RateLimiter, Spotify, SpotifyException
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.response_cache import MemoryResponseCache
+from spotipy.client import _json_dumps as spotipy_json_dumps
+from spotipy.client import _json_loads as spotipy_json_loads
+
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
+patch = mock.patch
+
+
+def _make_page(offset, limit=2, total=7, url="https://api.spotify.com/v1/me/tracks"):
+    def page_url(page_offset):
+        if page_offset >= total:
+            return None
+        return "%s?offset=%d&limit=%d" % (url, page_offset, limit)
+    return {
+        "href": page_url(offset),
+        "items": list(range(offset, min(offset + limit, total))),
+        "limit": limit,
+        "next": page_url(offset + limit),
+        "offset": offset,
+        "previous": page_url(offset - limit) if offset else None,
+        "total": total,
+    }
+
+
+def _get_page(url, **kwargs):
+    return _make_page(int(re.search(r"offset=(\d+)", url).group(1)))
+
+
+def _make_response(status_code=200, body=b"", headers=None, url="https://api.spotify.com/v1/me"):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = url
+    return response
+
+
+def _make_spotify_with_session(*responses, **kwargs):
+    spotify = Spotify(auth="TOKEN", **kwargs)
+    spotify._session = mock.Mock()
+    spotify._session.request.side_effect = list(responses)
+    return spotify
+
+
+def _make_search_result(market, items=1):
+    return {"tracks": {"items": [market] * items}}
+
+
+class SpotifySearchMarketsTest(unittest.TestCase):
+
+    @patch.object(Spotify, "_get")
+    def test_searches_every_market_concurrently(self, get):
+        get.side_effect = lambda url, **kwargs: _make_search_result(kwargs["market"])
+        spotify = Spotify(auth="TOKEN")
+
+        results = spotify._search_multiple_markets(
+            "weezer", 10, 0, "track", ["US", "CA", "MX"], None)
+
+        self.assertEqual(sorted(results), ["CA", "MX", "US"])
+        for market, result in results.items():
+            self.assertEqual(result["tracks"]["items"], [market])
+        self.assertEqual(get.call_count, 3)
+
+    @patch.object(Spotify, "_get")
+    def test_total_stops_searching_markets(self, get):
+        get.side_effect = lambda url, **kwargs: _make_search_result(kwargs["market"], 10)
+        spotify = Spotify(auth="TOKEN")
+
+        results = spotify._search_multiple_markets(
+            "weezer", 10, 0, "track", ["US", "CA", "MX"], 15)
+
+        self.assertEqual(sorted(results), ["CA", "US"])
+        limits = {c[1]["market"]: c[1]["limit"] for c in get.call_args_list}
+        self.assertEqual(limits, {"US": 10, "CA": 5})
+
+    @patch.object(Spotify, "_get")
+    def test_total_searches_more_markets_when_results_are_short(self, get):
+        items = {"US": 10, "CA": 2, "MX": 10, "BR": 10}
+        get.side_effect = lambda url, **kwargs: _make_search_result(
+            kwargs["market"], min(items[kwargs["market"]], kwargs["limit"]))
+        spotify = Spotify(auth="TOKEN")
+
+        results = spotify._search_multiple_markets(
+            "weezer", 10, 0, "track", ["US", "CA", "MX", "BR"], 15)
+
+        self.assertEqual(sorted(results), ["CA", "MX", "US"])
+        limits = {c[1]["market"]: c[1]["limit"] for c in get.call_args_list}
+        self.assertEqual(limits, {"US": 10, "CA": 5, "MX": 3})
+
+    @patch.object(Spotify, "_get")
+    def test_single_worker_searches_serially(self, get):
+        get.side_effect = lambda url, **kwargs: _make_search_result(kwargs["market"])
+        spotify = Spotify(auth="TOKEN", max_workers=1)
+
+        results = spotify._search_multiple_markets(
+            "weezer", 10, 0, "track", ["US", "CA"], None)
+
+        self.assertEqual(sorted(results), ["CA", "US"])
+        self.assertEqual([c[1]["market"] for c in get.call_args_list], ["US", "CA"])
+
+
+class SpotifyIterAllTest(unittest.TestCase):
+
+    @patch.object(Spotify, "_get")
+    def test_yields_items_of_every_page_in_order(self, get):
+        get.side_effect = _get_page
+        spotify = Spotify(auth="TOKEN", max_workers=2)
+
+        items = list(spotify.iter_all(_make_page(0)))
+
+        self.assertEqual(items, list(range(7)))
+        self.assertEqual(get.call_count, 3)
+
+    @patch.object(Spotify, "_get")
+    def test_single_page_needs_no_request(self, get):
+        spotify = Spotify(auth="TOKEN")
+
+        items = list(spotify.iter_all(_make_page(0, limit=10)))
+
+        self.assertEqual(items, list(range(7)))
+        self.assertEqual(get.call_count, 0)
+
+    @patch.object(Spotify, "_get")
+    def test_unwraps_pages(self, get):
+        # e.g. the pages of a search are wrapped in the type searched for
+        get.side_effect = lambda url: {"albums": _get_page(url)}
+        spotify = Spotify(auth="TOKEN", max_workers=2)
+
+        items = list(spotify.iter_all({"albums": _make_page(0)}))
+
+        self.assertEqual(items, list(range(7)))
+        self.assertEqual(get.call_count, 3)
+
+    @patch.object(Spotify, "_get")
+    def test_follows_next_without_offset_one_page_at_a_time(self, get):
+        url = "https://api.spotify.com/v1/me/tracks?page="
+        pages = {
+            url + "2": {"items": [2, 3], "offset": 2, "limit": 2, "total": 6,
+                        "next": url + "3"},
+            url + "3": {"items": [4, 5], "offset": 4, "limit": 2, "total": 6,
+                        "next": None},
+        }
+        get.side_effect = pages.get
+        spotify = Spotify(auth="TOKEN", max_workers=2)
+
+        items = list(spotify.iter_all({"items": [0, 1], "offset": 0, "limit": 2,
+                                       "total": 6, "next": url + "2"}))
+
+        self.assertEqual(items, list(range(6)))
+        self.assertEqual(get.call_count, 2)
+
+    @patch.object(Spotify, "_get")
+    def test_follows_cursor_pages(self, get):
+        last = {"items": [2, 3], "next": None, "cursors": {"after": None}}
+        first = {"items": [0, 1], "next": "https://api.spotify.com/v1/me/following?after=1",
+                 "cursors": {"after": "1"}}
+        get.return_value = last
+        spotify = Spotify(auth="TOKEN")
+
+        items = list(spotify.iter_all(first))
+
+        self.assertEqual(items, [0, 1, 2, 3])
+        get.assert_called_once_with(first["next"])
+
+    @patch.object(Spotify, "_get")
+    def test_unwraps_cursor_pages(self, get):
+        # e.g. the pages of current_user_followed_artists
+        first = {"artists": {"items": [0, 1], "cursors": {"after": "1"},
+                             "next": "https://api.spotify.com/v1/me/following?after=1"}}
+        get.return_value = {"artists": {"items": [2], "cursors": {"after": None},
+                                        "next": None}}
+        spotify = Spotify(auth="TOKEN", max_workers=2)
+
+        items = list(spotify.iter_all(first))
+
+        self.assertEqual(items, [0, 1, 2])
+        get.assert_called_once_with(first["artists"]["next"])
+
+    @patch.object(Spotify, "_get")
+    def test_prefetches_the_next_cursor_page(self, get):
+        pages = [
+            {"items": [0, 1], "next": "https://api.spotify.com/v1/me/player/recently-played?b=1"},
+            {"items": [2, 3], "next": "https://api.spotify.com/v1/me/player/recently-played?b=2"},
+            {"items": [4], "next": None},
+        ]
+        fetched = threading.Event()
+
+        def get_page(url):
+            fetched.set()
+            return pages[int(url[-1])]
+        get.side_effect = get_page
+        spotify = Spotify(auth="TOKEN", max_workers=2)
+
+        items = spotify.iter_all(pages[0])
+
+        self.assertEqual(next(items), 0)
+        # the second page is requested before the first one is consumed
+        self.assertTrue(fetched.wait(5))
+        self.assertEqual(list(items), [1, 2, 3, 4])
+        self.assertEqual(get.call_count, 2)
+
+
+class SpotifyParallelMapTest(unittest.TestCase):
+
+    def test_returns_results_in_order(self):
+        spotify = Spotify(auth="TOKEN", max_workers=4)
+
+        self.assertEqual(spotify.parallel_map(lambda x: x * 2, range(10)),
+                         [x * 2 for x in range(10)])
+
+    def test_single_worker_calls_in_this_thread(self):
+        spotify = Spotify(auth="TOKEN")
+        calls = []
+
+        spotify.parallel_map(calls.append, iter([1, 2, 3]), max_workers=1)
+
+        self.assertEqual(calls, [1, 2, 3])
+
+
+class SpotifyAuthHeadersTest(unittest.TestCase):
+
+    def _make_auth_manager(self, expires_in):
+        token_info = {"access_token": "ACCESS", "expires_at": int(time.time()) + expires_in}
+        auth_manager = mock.Mock()
+        auth_manager.cache_handler = MemoryCacheHandler(token_info)
+        auth_manager.get_access_token.return_value = "ACCESS"
+        return auth_manager
+
+    def test_reuses_headers_until_token_expires(self):
+        auth_manager = self._make_auth_manager(3600)
+        spotify = Spotify(auth_manager=auth_manager)
+
+        first = spotify._auth_headers()
+        second = spotify._auth_headers()
+
+        self.assertEqual(first, {"Authorization": "Bearer ACCESS"})
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(auth_manager.get_access_token.call_count, 1)
+
+    def test_asks_again_when_token_about_to_expire(self):
+        auth_manager = self._make_auth_manager(30)
+        spotify = Spotify(auth_manager=auth_manager)
+
+        spotify._auth_headers()
+        spotify._auth_headers()
+
+        self.assertEqual(auth_manager.get_access_token.call_count, 2)
+
+    def test_threads_renew_the_token_once(self):
+        auth_manager = self._make_auth_manager(3600)
+
+        def get_access_token(as_dict):
+            time.sleep(0.05)
+            return "ACCESS"
+        auth_manager.get_access_token.side_effect = get_access_token
+        spotify = Spotify(auth_manager=auth_manager, max_workers=8)
+
+        spotify.parallel_map(lambda _: spotify._auth_headers(), range(8))
+
+        self.assertEqual(auth_manager.get_access_token.call_count, 1)
+
+    def test_new_auth_manager_drops_cached_headers(self):
+        spotify = Spotify(auth_manager=self._make_auth_manager(3600))
+        spotify._auth_headers()
+
+        other = self._make_auth_manager(3600)
+        other.get_access_token.return_value = "OTHER"
+        spotify.auth_manager = other
+
+        self.assertEqual(spotify._auth_headers(), {"Authorization": "Bearer OTHER"})
+
+
+class SpotifyInternalCallTest(unittest.TestCase):
+
+    def _assert_round_trip(self):
+        spotify = _make_spotify_with_session(_make_response(body=b'{"snapshot_id": "S"}'))
+
+        result = spotify._post("playlists/PL/tracks", payload=["spotify:track:T"])
+
+        self.assertEqual(result, {"snapshot_id": "S"})
+        data = spotify._session.request.call_args[1]["data"]
+        self.assertEqual(json.loads(data), ["spotify:track:T"])
+
+    def test_encodes_payload_and_decodes_results(self):
+        self._assert_round_trip()
+
+    @patch("spotipy.client.orjson", None)
+    def test_encodes_and_decodes_without_orjson(self):
+        self._assert_round_trip()
+
+    @patch("spotipy.client.orjson", None)
+    def test_encodes_payload_compactly_without_orjson(self):
+        self.assertEqual(spotipy_json_dumps({"ids": ["A", "B"]}), '{"ids":["A","B"]}')
+
+    def test_leaves_out_params_that_are_none(self):
+        spotify = _make_spotify_with_session(_make_response(status_code=204))
+
+        spotify._get("tracks/T", market=None, limit=10)
+
+        self.assertEqual(spotify._session.request.call_args[1]["params"], {"limit": 10})
+
+    def test_empty_body_returns_none(self):
+        spotify = _make_spotify_with_session(_make_response(status_code=204))
+
+        self.assertIsNone(spotify._put("me/player/pause"))
+
+    def test_http_error_reports_message_and_reason(self):
+        body = b'{"error": {"status": 403, "message": "Player command failed", ' \
+               b'"reason": "PREMIUM_REQUIRED"}}'
+        spotify = _make_spotify_with_session(_make_response(status_code=403, body=body))
+
+        with patch("spotipy.client._json_loads", wraps=spotipy_json_loads) as loads:
+            with self.assertRaises(SpotifyException) as cm:
+                spotify._put("me/player/play")
+
+        self.assertEqual(cm.exception.http_status, 403)
+        self.assertIn("Player command failed", cm.exception.msg)
+        self.assertEqual(cm.exception.reason, "PREMIUM_REQUIRED")
+        self.assertEqual(loads.call_count, 1)
+
+    def test_static_headers_are_set_on_own_session(self):
+        spotify = Spotify(auth="TOKEN", language="es")
+
+        self.assertEqual(spotify._session.headers["Content-Type"], "application/json")
+        self.assertEqual(spotify._session.headers["Accept-Language"], "es")
+
+    def test_changing_language_updates_own_session(self):
+        spotify = Spotify(auth="TOKEN", language="es")
+
+        spotify.language = "fr"
+        self.assertEqual(spotify._session.headers["Accept-Language"], "fr")
+        spotify.language = None
+        self.assertNotIn("Accept-Language", spotify._session.headers)
+
+    def test_changing_language_updates_headers_sent_with_given_session(self):
+        session = requests.Session()
+        session.request = mock.Mock(return_value=_make_response(status_code=204))
+        spotify = Spotify(auth="TOKEN", requests_session=session, language="es")
+
+        spotify.language = "fr"
+        spotify._get("me")
+
+        self.assertEqual(session.request.call_args[1]["headers"]["Accept-Language"], "fr")
+
+    def test_own_session_accepts_every_supported_encoding(self):
+        spotify = Spotify(auth="TOKEN")
+
+        with patch("urllib3.util.request.ACCEPT_ENCODING", "gzip,deflate,br"):
+            spotify._build_session()
+
+        self.assertEqual(spotify._session.headers["Accept-Encoding"], "gzip,deflate,br")
+
+    def test_static_headers_are_sent_per_call_with_given_session(self):
+        session = requests.Session()
+        session.request = mock.Mock(return_value=_make_response(status_code=204))
+        spotify = Spotify(auth="TOKEN", requests_session=session, language="es")
+
+        spotify._get("me")
+
+        self.assertNotIn("Accept-Language", session.headers)
+        headers = session.request.call_args[1]["headers"]
+        self.assertEqual(headers["Content-Type"], "application/json")
+        self.assertEqual(headers["Accept-Language"], "es")
+
+    def test_http_error_without_error_object(self):
+        body = b'{"error": "invalid_client"}'
+        spotify = _make_spotify_with_session(_make_response(status_code=400, body=body))
+
+        with self.assertRaises(SpotifyException) as cm:
+            spotify._get("me")
+
+        self.assertIn("error", cm.exception.msg)
+        self.assertIsNone(cm.exception.reason)
+
+
+class SpotifySeveralItemsTest(unittest.TestCase):
+
+    @staticmethod
+    def _get_tracks(url, **kwargs):
+        return {"tracks": [{"id": i} for i in kwargs["ids"].split(",")]}
+
+    @patch.object(Spotify, "_get")
+    def test_splits_long_id_lists_into_batches(self, get):
+        get.side_effect = self._get_tracks
+        spotify = Spotify(auth="TOKEN")
+        ids = ["%022d" % i for i in range(120)]
+
+        results = spotify.tracks(ids, market="US")
+
+        self.assertEqual([t["id"] for t in results["tracks"]], ids)
+        self.assertEqual(get.call_count, 3)
+        for call in get.call_args_list:
+            self.assertEqual(call[0], ("tracks",))
+            self.assertEqual(call[1]["market"], "US")
+
+    @patch.object(Spotify, "_get")
+    def test_albums_batches_hold_twenty_ids(self, get):
+        get.side_effect = lambda url, **kwargs: {"albums": kwargs["ids"].split(",")}
+        spotify = Spotify(auth="TOKEN")
+
+        results = spotify.albums(["spotify:album:%022d" % i for i in range(21)])
+
+        self.assertEqual(len(results["albums"]), 21)
+        self.assertEqual(get.call_count, 2)
+
+    @patch.object(Spotify, "_get")
+    def test_audio_features_of_many_tracks_are_fetched_in_batches(self, get):
+        get.side_effect = lambda url, ids: {
+            "audio_features": [{"id": id} for id in ids.split(",")]}
+        spotify = Spotify(auth="TOKEN")
+        ids = ["%022d" % i for i in range(250)]
+
+        features = spotify.audio_features(ids)
+
+        self.assertEqual([f["id"] for f in features], ids)
+        self.assertEqual(get.call_count, 3)
+
+
+class SpotifyGetIdTest(unittest.TestCase):
+
+    def setUp(self):
+        self.spotify = Spotify(auth="TOKEN")
+
+    def test_bare_id_is_returned_as_is(self):
+        self.assertEqual(self.spotify._get_id("track", "4iV5W9uYEdYUVa79Axb7Rh"),
+                         "4iV5W9uYEdYUVa79Axb7Rh")
+
+    def test_parses_uris_and_urls(self):
+        for id in ("spotify:track:4iV5W9uYEdYUVa79Axb7Rh",
+                   "https://open.spotify.com/track/4iV5W9uYEdYUVa79Axb7Rh?si=1"):
+            self.assertEqual(self.spotify._get_id("track", id), "4iV5W9uYEdYUVa79Axb7Rh")
+
+    def test_parses_user_playlist_uris_and_urls(self):
+        for id in ("spotify:user:plamere:playlist:37i9dQZF1DXcBWIGoYBM5M",
+                   "https://open.spotify.com/user/plamere/playlist/37i9dQZF1DXcBWIGoYBM5M",
+                   "http://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M?si=a"):
+            self.assertEqual(self.spotify._get_id("playlist", id), "37i9dQZF1DXcBWIGoYBM5M")
+
+    def test_uri_of_another_type_is_reported(self):
+        with patch("spotipy.client.logger") as logger:
+            self.assertEqual(self.spotify._get_id("album", "spotify:track:4iV5W9uYEdYUVa79Axb7Rh"),
+                             "4iV5W9uYEdYUVa79Axb7Rh")
+        self.assertTrue(logger.warning.called)
+
+    def test_gets_uri_of_each_form(self):
+        for id in ("spotify:track:4iV5W9uYEdYUVa79Axb7Rh", "4iV5W9uYEdYUVa79Axb7Rh",
+                   "https://open.spotify.com/track/4iV5W9uYEdYUVa79Axb7Rh?si=1"):
+            self.assertEqual(self.spotify._get_uri("track", id),
+                             "spotify:track:4iV5W9uYEdYUVa79Axb7Rh")
+
+    def test_recognizes_uris(self):
+        self.assertTrue(self.spotify._is_uri("spotify:track:4iV5W9uYEdYUVa79Axb7Rh"))
+        self.assertFalse(self.spotify._is_uri("spotify:user:plamere:playlist:PL"))
+        self.assertFalse(self.spotify._is_uri("4iV5W9uYEdYUVa79Axb7Rh"))
+
+    def test_id_of_unexpected_length_is_still_accepted(self):
+        self.assertEqual(self.spotify._get_id("user", "plamere"), "plamere")
+
+    def test_gets_ids_and_uris_of_mixed_forms(self):
+        ids = ["4iV5W9uYEdYUVa79Axb7Rh", "spotify:track:1301WleyT98MSxVHPZCA6M",
+               "https://open.spotify.com/track/6rqhFgbbKwnb9MLmUQDhG6?si=1"]
+
+        self.assertEqual(self.spotify._get_ids("track", ids),
+                         ["4iV5W9uYEdYUVa79Axb7Rh", "1301WleyT98MSxVHPZCA6M",
+                          "6rqhFgbbKwnb9MLmUQDhG6"])
+        self.assertEqual(self.spotify._get_uris("track", ids),
+                         ["spotify:track:4iV5W9uYEdYUVa79Axb7Rh",
+                          "spotify:track:1301WleyT98MSxVHPZCA6M",
+                          "spotify:track:6rqhFgbbKwnb9MLmUQDhG6"])
+
+
+class SpotifyRateLimitTest(unittest.TestCase):
+
+    def test_waits_for_the_limiter_before_each_request(self):
+        spotify = _make_spotify_with_session(_make_response(status_code=204), rate_limit=5)
+        spotify.rate_limiter = mock.Mock(spec=RateLimiter)
+
+        spotify._get("me")
+
+        spotify.rate_limiter.acquire.assert_called_once_with()
+
+    def test_too_many_requests_pauses_the_limiter(self):
+        response = _make_response(status_code=429, headers={"Retry-After": "4"})
+        limiter = mock.Mock(spec=RateLimiter)
+        spotify = _make_spotify_with_session(response, rate_limit=limiter, status_retries=0)
+
+        with self.assertRaises(SpotifyException):
+            spotify._get("me")
+
+        limiter.pause.assert_called_once_with(4)
+
+    def test_limiter_retries_too_many_requests(self):
+        limiter = mock.Mock(spec=RateLimiter)
+        spotify = _make_spotify_with_session(
+            _make_response(status_code=429, headers={"Retry-After": "2"}),
+            _make_response(body=b'{"id": "me"}'),
+            rate_limit=limiter)
+
+        self.assertEqual(spotify._get("me"), {"id": "me"})
+
+        limiter.pause.assert_called_once_with(2)
+        self.assertEqual(limiter.acquire.call_count, 2)
+
+    def test_limiter_backs_off_without_retry_after(self):
+        limiter = mock.Mock(spec=RateLimiter)
+        spotify = _make_spotify_with_session(
+            _make_response(status_code=429),
+            _make_response(status_code=429),
+            _make_response(body=b'{"id": "me"}'),
+            rate_limit=limiter, backoff_factor=0.5)
+
+        self.assertEqual(spotify._get("me"), {"id": "me"})
+
+        self.assertEqual(limiter.pause.call_args_list, [mock.call(0.5), mock.call(1.0)])
+
+    def test_limiter_takes_too_many_requests_off_the_session_retries(self):
+        spotify = Spotify(auth="TOKEN", rate_limit=5)
+
+        retry = spotify._session.get_adapter("https://").max_retries
+
+        self.assertNotIn(429, retry.status_forcelist)
+        self.assertIn(503, retry.status_forcelist)
+        self.assertIn(429, Spotify(auth="TOKEN")._session.get_adapter(
+            "https://").max_retries.status_forcelist)
+
+
+class SpotifyPlaylistChangeDetailsTest(unittest.TestCase):
+
+    @patch.object(Spotify, "_put")
+    def test_sends_only_given_details(self, put):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.playlist_change_details("PL", name=u"Mix", public=False)
+
+        self.assertEqual(put.call_args[1]["payload"], {"name": u"Mix", "public": False})
+
+
+class SpotifyResponseCacheTest(unittest.TestCase):
+
+    def test_revalidates_cached_response_with_etag(self):
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"name": "Mix"}', headers={"ETag": '"v1"'}),
+            _make_response(status_code=304, headers={"ETag": '"v1"'}),
+            response_cache=MemoryResponseCache())
+
+        first = spotify._get("playlists/PL", fields="name")
+        second = spotify._get("playlists/PL", fields="name")
+
+        self.assertEqual(first, {"name": "Mix"})
+        self.assertEqual(second, first)
+        self.assertIsNot(second, first)
+        calls = spotify._session.request.call_args_list
+        self.assertNotIn("If-None-Match", calls[0][1]["headers"])
+        self.assertEqual(calls[1][1]["headers"]["If-None-Match"], '"v1"')
+
+    def test_changed_response_replaces_cached_one(self):
+        cache = MemoryResponseCache()
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"name": "Mix"}', headers={"ETag": '"v1"'}),
+            _make_response(body=b'{"name": "New"}', headers={"ETag": '"v2"'}),
+            response_cache=cache)
+
+        spotify._get("playlists/PL")
+
+        self.assertEqual(spotify._get("playlists/PL"), {"name": "New"})
+        cached = cache.get_cached_response("https://api.spotify.com/v1/playlists/PL")
+        self.assertEqual(cached["etag"], '"v2"')
+
+    def test_fresh_response_is_used_without_a_request(self):
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"markets": ["AD"]}',
+                           headers={"Cache-Control": "public, max-age=3600"}),
+            response_cache=MemoryResponseCache())
+
+        first = spotify._get("markets")
+
+        self.assertEqual(spotify._get("markets"), first)
+        self.assertEqual(spotify._session.request.call_count, 1)
+
+    def test_expired_response_is_revalidated(self):
+        cache = MemoryResponseCache()
+        cache.save_response_to_cache("https://api.spotify.com/v1/markets", {
+            "etag": '"v1"', "body": b'{"markets": ["AD"]}', "expires_at": time.time() - 1})
+        spotify = _make_spotify_with_session(
+            _make_response(status_code=304, headers={"Cache-Control": "max-age=60"}),
+            response_cache=cache)
+
+        self.assertEqual(spotify._get("markets"), {"markets": ["AD"]})
+
+        headers = spotify._session.request.call_args[1]["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        cached = cache.get_cached_response("https://api.spotify.com/v1/markets")
+        self.assertGreater(cached["expires_at"], time.time())
+
+    def test_no_cache_responses_are_not_fresh(self):
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"id": "me"}',
+                           headers={"Cache-Control": "private, no-cache, max-age=60"}),
+            _make_response(body=b'{"id": "me"}'),
+            response_cache=MemoryResponseCache())
+
+        spotify._get("me")
+        spotify._get("me")
+
+        self.assertEqual(spotify._session.request.call_count, 2)
+
+    def test_current_user_responses_are_kept_apart_by_token(self):
+        cache = MemoryResponseCache()
+        first = _make_spotify_with_session(
+            _make_response(body=b'{"id": "first"}', headers={"Cache-Control": "max-age=60"}),
+            response_cache=cache)
+        second = Spotify(auth="OTHER", response_cache=cache)
+        second._session = mock.Mock()
+        second._session.request.return_value = _make_response(body=b'{"id": "second"}')
+
+        first._get("me")
+
+        self.assertEqual(second._get("me"), {"id": "second"})
+        self.assertEqual(first._get("me"), {"id": "first"})
+        self.assertEqual(first._session.request.call_count, 1)
+
+    def test_private_responses_are_kept_apart_by_token(self):
+        cache = MemoryResponseCache()
+        first = _make_spotify_with_session(
+            _make_response(body=b'{"name": "Mine"}',
+                           headers={"Cache-Control": "private, max-age=60"}),
+            response_cache=cache)
+        second = Spotify(auth="OTHER", response_cache=cache)
+        second._session = mock.Mock()
+        second._session.request.return_value = _make_response(status_code=404)
+
+        first._get("playlists/PRIV")
+
+        self.assertEqual(first._get("playlists/PRIV"), {"name": "Mine"})
+        with self.assertRaises(SpotifyException):
+            second._get("playlists/PRIV")
+
+    def test_responses_are_kept_apart_by_language(self):
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"name": "Rock"}', headers={"Cache-Control": "max-age=60"}),
+            _make_response(body=b'{"name": "Roca"}', headers={"Cache-Control": "max-age=60"}),
+            response_cache=MemoryResponseCache())
+        spotify._session.headers = {}
+
+        spotify._get("browse/categories/rock")
+        spotify.language = "es"
+
+        self.assertEqual(spotify._get("browse/categories/rock"), {"name": "Roca"})
+        self.assertEqual(spotify._session.request.call_count, 2)
+
+    def test_only_get_requests_are_cached(self):
+        cache = mock.Mock()
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"snapshot_id": "S"}', headers={"ETag": '"v1"'}),
+            response_cache=cache)
+
+        spotify._post("playlists/PL/tracks", payload=["spotify:track:T"])
+
+        self.assertFalse(cache.method_calls)
+
+    def test_stale_response_served_on_server_error(self):
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"genres": ["pop"]}'),
+            _make_response(status_code=503),
+            response_cache=MemoryResponseCache(), stale_if_error=True)
+
+        spotify._get("recommendations/available-genre-seeds")
+
+        self.assertEqual(spotify._get("recommendations/available-genre-seeds"),
+                         {"genres": ["pop"]})
+        calls = spotify._session.request.call_args_list
+        self.assertNotIn("If-None-Match", calls[1][1]["headers"])
+
+    def test_stale_response_served_when_unreachable(self):
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"name": "Mix"}', headers={"ETag": '"v1"'}),
+            requests.exceptions.ConnectionError(),
+            response_cache=MemoryResponseCache(), stale_if_error=True)
+
+        spotify._get("playlists/PL")
+
+        self.assertEqual(spotify._get("playlists/PL"), {"name": "Mix"})
+
+    def test_playback_state_is_never_cached(self):
+        cache = mock.Mock()
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"is_playing": true}', headers={"ETag": '"v1"'}),
+            _make_response(status_code=503),
+            response_cache=cache, stale_if_error=True)
+
+        spotify._get("me/player/currently-playing")
+
+        with self.assertRaises(SpotifyException):
+            spotify._get("me/player/currently-playing")
+        self.assertFalse(cache.method_calls)
+
+    def test_no_store_responses_are_not_kept(self):
+        cache = mock.Mock()
+        cache.get_cached_response.return_value = None
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"name": "Mix"}', headers={"Cache-Control": "no-store"}),
+            response_cache=cache, stale_if_error=True)
+
+        spotify._get("playlists/PL")
+
+        self.assertFalse(cache.save_response_to_cache.called)
+
+    def test_errors_raised_without_stale_if_error(self):
+        spotify = _make_spotify_with_session(
+            _make_response(body=b'{"name": "Mix"}', headers={"ETag": '"v1"'}),
+            _make_response(status_code=503),
+            response_cache=MemoryResponseCache())
+
+        spotify._get("playlists/PL")
+
+        with self.assertRaises(SpotifyException):
+            spotify._get("playlists/PL")
+
+
+class SpotifyBatchedWritesTest(unittest.TestCase):
+
+    @patch.object(Spotify, "_post")
+    def test_playlist_add_items_in_batches_of_one_hundred(self, post):
+        post.side_effect = lambda url, **kwargs: {"snapshot_id": len(kwargs["payload"])}
+        spotify = Spotify(auth="TOKEN")
+
+        result = spotify.playlist_add_items("PL", ["%022d" % i for i in range(250)], position=3)
+
+        self.assertEqual(result, {"snapshot_id": 50})
+        self.assertEqual([c[1]["position"] for c in post.call_args_list], [3, 103, 203])
+        self.assertEqual(post.call_args_list[2][1]["payload"][0], "spotify:track:%022d" % 200)
+
+    @patch.object(Spotify, "_post")
+    @patch.object(Spotify, "_put")
+    def test_playlist_replace_items_adds_the_rest(self, put, post):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.playlist_replace_items("PL", ["%022d" % i for i in range(150)])
+
+        self.assertEqual(len(put.call_args[1]["payload"]["uris"]), 100)
+        self.assertEqual(len(post.call_args[1]["payload"]), 50)
+
+    @patch.object(Spotify, "_delete")
+    def test_playlist_remove_all_occurrences_in_batches(self, delete):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.playlist_remove_all_occurrences_of_items(
+            "PL", ["%022d" % i for i in range(101)], snapshot_id="S")
+
+        payloads = [c[1]["payload"] for c in delete.call_args_list]
+        self.assertEqual([len(p["tracks"]) for p in payloads], [100, 1])
+        self.assertEqual([p["snapshot_id"] for p in payloads], ["S", "S"])
+
+    @patch.object(Spotify, "_put")
+    def test_saved_tracks_add_in_batches_of_fifty(self, put):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.current_user_saved_tracks_add(["%022d" % i for i in range(60)])
+
+        self.assertEqual([c[0][0] for c in put.call_args_list], ["me/tracks"] * 2)
+        self.assertEqual([len(c[1]["payload"]["ids"]) for c in put.call_args_list], [50, 10])
+
+    @patch.object(Spotify, "_delete")
+    def test_saved_shows_delete_sends_ids_in_query(self, delete):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.current_user_saved_shows_delete(["spotify:show:%022d" % 1])
+
+        delete.assert_called_once_with("me/shows", ids="%022d" % 1)
+
+    @patch.object(Spotify, "_put")
+    def test_user_follow_artists_sends_ids_in_body(self, put):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.user_follow_artists(["A", "B"])
+
+        put.assert_called_once_with("me/following", payload={"ids": ["A", "B"]}, type="artist")
+
+    @patch.object(Spotify, "_get")
+    def test_saved_albums_contains_in_batches_of_twenty(self, get):
+        get.side_effect = lambda url, **kwargs: [True] * len(kwargs["ids"].split(","))
+        spotify = Spotify(auth="TOKEN")
+
+        result = spotify.current_user_saved_albums_contains(["%022d" % i for i in range(30)])
+
+        self.assertEqual(result, [True] * 30)
+        self.assertEqual(get.call_count, 2)
+
+
+class SpotifyFollowingContainsTest(unittest.TestCase):
+
+    @patch.object(Spotify, "_get")
+    def test_following_artists_checked_in_batches_of_fifty(self, get):
+        get.side_effect = lambda url, ids, type: [True] * len(ids.split(","))
+        spotify = Spotify(auth="TOKEN")
+
+        result = spotify.current_user_following_artists(["%022d" % i for i in range(60)])
+
+        self.assertEqual(result, [True] * 60)
+        self.assertEqual(sorted(len(c[1]["ids"].split(",")) for c in get.call_args_list),
+                         [10, 50])
+        self.assertEqual({c[1]["type"] for c in get.call_args_list}, {"artist"})
+
+    @patch.object(Spotify, "_get")
+    def test_playlist_followers_checked_in_batches_of_five(self, get):
+        get.side_effect = lambda url, ids: [False] * len(ids.split(","))
+        spotify = Spotify(auth="TOKEN", max_workers=1)
+
+        result = spotify.playlist_is_following("PL", ["u%d" % i for i in range(7)])
+
+        self.assertEqual(result, [False] * 7)
+        get.assert_called_with("playlists/PL/followers/contains", ids="u5,u6")
+        self.assertEqual(get.call_count, 2)
+
+
+class SpotifyRecommendationsTest(unittest.TestCase):
+
+    @patch.object(Spotify, "_get")
+    def test_passes_only_tuneable_attributes(self, get):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.recommendations(seed_genres=["rock"], limit=5, target_energy=0.8,
+                                max_tempo=120, energy=1, min_color=2)
+
+        get.assert_called_once_with("recommendations", limit=5, seed_genres="rock",
+                                    target_energy=0.8, max_tempo=120)
+
+    @patch.object(Spotify, "_get")
+    def test_seeds_are_required(self, get):
+        spotify = Spotify(auth="TOKEN")
+
+        with self.assertRaises(SpotifyException) as cm:
+            spotify.recommendations(seed_artists=[], target_energy=0.8)
+
+        self.assertEqual(cm.exception.http_status, 400)
+
+        get.assert_not_called()
+
+
+class SpotifyUniqueIdsTest(unittest.TestCase):
+
+    @patch.object(Spotify, "_get")
+    def test_audio_features_requests_each_track_once(self, get):
+        get.return_value = {"audio_features": [{"id": "A"}, {"id": "B"}]}
+        spotify = Spotify(auth="TOKEN")
+
+        features = spotify.audio_features(["A", "B", "A"], unique=True)
+
+        get.assert_called_once_with("audio-features", ids="A,B")
+        self.assertEqual([f["id"] for f in features], ["A", "B", "A"])
+
+    @patch.object(Spotify, "_get")
+    def test_contains_checks_each_item_once(self, get):
+        get.return_value = [True, False]
+        spotify = Spotify(auth="TOKEN")
+
+        found = spotify.current_user_saved_tracks_contains(
+            ["A", "spotify:track:B", "A"], unique=True)
+
+        get.assert_called_once_with("me/tracks/contains", ids="A,B")
+        self.assertEqual(found, [True, False, True])
+
+
+class SpotifyPlaybackTest(unittest.TestCase):
+
+    def test_sends_query_values_as_params(self):
+        spotify = _make_spotify_with_session(
+            _make_response(status_code=204), _make_response(status_code=204))
+
+        spotify.seek_track(1500, device_id="D")
+        spotify.add_to_queue("4iV5W9uYEdYUVa79Axb7Rh")
+
+        seek, queue = spotify._session.request.call_args_list
+        self.assertEqual(seek[0][1], "https://api.spotify.com/v1/me/player/seek")
+        self.assertEqual(seek[1]["params"], {"position_ms": 1500, "device_id": "D"})
+        self.assertEqual(queue[1]["params"], {"uri": "spotify:track:4iV5W9uYEdYUVa79Axb7Rh"})
+
+    @patch.object(Spotify, "_put")
+    def test_start_playback_sends_only_given_fields(self, put):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.start_playback(uris=["spotify:track:T"], position_ms=0)
+
+        put.assert_called_once_with("me/player/play", device_id=None,
+                                    payload={"uris": ["spotify:track:T"], "position_ms": 0})
+
+    @patch.object(Spotify, "_put")
+    def test_repeat_rejects_unknown_states(self, put):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.repeat("all")
+        spotify.repeat("context")
+
+        put.assert_called_once_with("me/player/repeat", state="context", device_id=None)
+
+    @patch.object(Spotify, "_put")
+    def test_shuffle_sends_state_as_json_boolean(self, put):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.shuffle(True)
+        spotify.shuffle(False, device_id="D")
+
+        self.assertEqual(put.call_args_list, [
+            mock.call("me/player/shuffle", state="true", device_id=None),
+            mock.call("me/player/shuffle", state="false", device_id="D"),
+        ])
+
+
+class SpotifyEmptyInputTest(unittest.TestCase):
+
+    @patch.object(Spotify, "_internal_call")
+    def test_empty_lists_send_no_request(self, internal_call):
+        spotify = Spotify(auth="TOKEN")
+
+        self.assertEqual(spotify.audio_features([]), [])
+        self.assertEqual(spotify.tracks([]), {"tracks": []})
+        self.assertEqual(spotify.current_user_saved_tracks_contains([]), [])
+        spotify.current_user_saved_albums_add([])
+        spotify.user_follow_artists([])
+        spotify.playlist_add_items("PL", [])
+        spotify.playlist_remove_all_occurrences_of_items("PL", [])
+        spotify.playlist_remove_specific_occurrences_of_items("PL", [])
+
+        internal_call.assert_not_called()
+
+    @patch.object(Spotify, "_put")
+    def test_replacing_with_no_items_empties_the_playlist(self, put):
+        spotify = Spotify(auth="TOKEN")
+
+        spotify.playlist_replace_items("PL", [])
+
+        put.assert_called_once_with("playlists/PL/tracks", payload={"uris": []})
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from spotipy import RateLimiter
+
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
+patch = mock.patch
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patchers = [patch("spotipy.rate_limit._clock", self.clock),
+                    patch("spotipy.rate_limit.time.sleep", self.clock.sleep)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_spaces_out_requests_after_a_burst(self):
+        limiter = RateLimiter(2, capacity=3)
+
+        for _ in range(5):
+            limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5])
+
+    def test_bucket_drains_over_time(self):
+        limiter = RateLimiter(2, capacity=2)
+        limiter.acquire()
+        limiter.acquire()
+
+        self.clock.now += 1
+        limiter.acquire()
+        limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_pause_holds_back_requests(self):
+        limiter = RateLimiter(10)
+
+        limiter.pause(3)
+        limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [3])
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from spotipy import MemoryResponseCache, SQLiteResponseCache
+
+
+class MemoryResponseCacheTest(unittest.TestCase):
+
+    def test_returns_saved_response(self):
+        cache = MemoryResponseCache()
+        response_info = {"etag": '"v1"', "body": b"{}"}
+
+        cache.save_response_to_cache("tracks/T", response_info)
+
+        self.assertEqual(cache.get_cached_response("tracks/T"), response_info)
+        self.assertIsNone(cache.get_cached_response("tracks/U"))
+
+    def test_evicts_least_recently_used_response(self):
+        cache = MemoryResponseCache(max_size=2)
+        cache.save_response_to_cache("a", {"etag": "a", "body": b"{}"})
+        cache.save_response_to_cache("b", {"etag": "b", "body": b"{}"})
+        cache.get_cached_response("a")
+
+        cache.save_response_to_cache("c", {"etag": "c", "body": b"{}"})
+
+        self.assertIsNotNone(cache.get_cached_response("a"))
+        self.assertIsNone(cache.get_cached_response("b"))
+        self.assertIsNotNone(cache.get_cached_response("c"))
+
+
+class ImportTest(unittest.TestCase):
+
+    def test_importing_spotipy_does_not_load_sqlite3(self):
+        code = "import sys, spotipy; sys.exit('sqlite3' in sys.modules)"
+        self.assertEqual(subprocess.call([sys.executable, "-c", code]), 0)
+
+
+class SQLiteResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.cache_path = os.path.join(directory, "responses.sqlite")
+
+    def test_responses_outlive_the_instance(self):
+        response_info = {"etag": '"v1"', "body": b'{"name": "Mix"}'}
+        SQLiteResponseCache(self.cache_path).save_response_to_cache("playlists/PL", response_info)
+
+        cache = SQLiteResponseCache(self.cache_path)
+
+        self.assertEqual(cache.get_cached_response("playlists/PL"), response_info)
+        self.assertIsNone(cache.get_cached_response("playlists/other"))
+
+    def test_keeps_expiry_time(self):
+        response_info = {"etag": None, "body": b"{}", "expires_at": 1234.5}
+        SQLiteResponseCache(self.cache_path).save_response_to_cache("markets", response_info)
+
+        cache = SQLiteResponseCache(self.cache_path)
+
+        self.assertEqual(cache.get_cached_response("markets"), response_info)
+
+    def test_keeps_most_recently_saved_responses(self):
+        cache = SQLiteResponseCache(self.cache_path, max_size=2)
+
+        for key in ("a", "b", "a", "c"):
+            cache.save_response_to_cache(key, {"etag": key, "body": b"{}"})
+
+        self.assertIsNone(cache.get_cached_response("b"))
+        self.assertEqual(cache.get_cached_response("a")["etag"], "a")
+        self.assertEqual(cache.get_cached_response("c")["etag"], "c")
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+
+import requests
+
+from spotipy import HTTPXSession, Spotify, SpotifyException
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def _make_session(handler):
+    session = HTTPXSession(headers={"Content-Type": "application/json"})
+    session._client = httpx.Client(headers=session.headers,
+                                   transport=httpx.MockTransport(handler))
+    return session
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class HTTPXSessionTest(unittest.TestCase):
+
+    def test_returns_requests_response(self):
+        def handler(request):
+            self.assertEqual(request.url.params.get("market"), "US")
+            self.assertEqual(request.headers["Content-Type"], "application/json")
+            return httpx.Response(200, json={"id": "T"})
+        session = _make_session(handler)
+
+        response = session.request("GET", "https://api.spotify.com/v1/tracks/T",
+                                   params={"market": "US"})
+
+        self.assertIsInstance(response, requests.Response)
+        self.assertEqual(response.json(), {"id": "T"})
+
+    def test_sends_body(self):
+        def handler(request):
+            return httpx.Response(201, content=request.content)
+        session = _make_session(handler)
+
+        response = session.request("POST", "https://api.spotify.com/v1/x", data=b"[1]")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.content, b"[1]")
+
+    def test_converts_requests_timeout_tuple(self):
+        def handler(request):
+            timeout = request.extensions["timeout"]
+            self.assertEqual((timeout["connect"], timeout["read"]), (3, 10))
+            return httpx.Response(200, json={})
+        session = _make_session(handler)
+
+        response = session.request("GET", "https://api.spotify.com/v1/me", timeout=(3, 10))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_routes_requests_through_proxies(self):
+        session = HTTPXSession(proxies={"https": "http://10.10.1.10:1080"})
+
+        self.assertEqual(len(session._client._mounts), 1)
+
+    def test_connection_errors_are_requests_errors(self):
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+        session = _make_session(handler)
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            session.request("GET", "https://api.spotify.com/v1/me")
+
+    def test_spotify_client_raises_spotify_exception(self):
+        def handler(request):
+            body = {"error": {"status": 404, "message": "Not found"}}
+            return httpx.Response(404, content=json.dumps(body).encode())
+        spotify = Spotify(auth="TOKEN", transport="httpx")
+        spotify._session._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+        with self.assertRaises(SpotifyException) as cm:
+            spotify.track("4iV5W9uYEdYUVa79Axb7Rh")
+
+        self.assertEqual(cm.exception.http_status, 404)
+        self.assertIn("Not found", cm.exception.msg)
+
+    def test_spotify_client_leaves_out_none_params(self):
+        def handler(request):
+            self.assertNotIn("market", request.url.params)
+            return httpx.Response(200, json={"id": "T"})
+        spotify = Spotify(auth="TOKEN", transport="httpx")
+        spotify._session._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+        self.assertEqual(spotify.track("4iV5W9uYEdYUVa79Axb7Rh"), {"id": "T"})
+
+    def test_spotify_client_builds_httpx_session(self):
+        spotify = Spotify(auth="TOKEN", transport="httpx", language="es")
+
+        self.assertIsInstance(spotify._session, HTTPXSession)
+        self.assertEqual(spotify._session.headers["Accept-Language"], "es")
+
+    def test_httpx_session_asks_for_compressed_responses(self):
+        spotify = Spotify(auth="TOKEN", transport="httpx")
+
+        self.assertIn("gzip", spotify._session.headers["Accept-Encoding"])
+
+
+class SpotifyTransportTest(unittest.TestCase):
+
+    def test_unknown_transport(self):
+        with self.assertRaises(ValueError):
+            Spotify(auth="TOKEN", transport="urllib")
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class SpotifySharedHTTPXSessionTest(unittest.TestCase):
+
+    def test_clients_share_a_given_session(self):
+        requests_made = []
+
+        def handler(request):
+            requests_made.append(request)
+            return httpx.Response(200, json={"id": "T"})
+        session = HTTPXSession(client=httpx.Client(transport=httpx.MockTransport(handler)))
+        first = Spotify(auth="TOKEN", requests_session=session)
+        second = Spotify(auth="TOKEN", requests_session=session, language="es")
+
+        first.track("4iV5W9uYEdYUVa79Axb7Rh")
+        del first
+        second.track("4iV5W9uYEdYUVa79Axb7Rh")
+
+        self.assertEqual(len(requests_made), 2)
+        self.assertEqual(requests_made[1].headers["Accept-Language"], "es")
+        self.assertNotIn("Accept-Language", session.headers)